@@ -1,41 +1,60 @@
+import hashlib
+import logging
+import uuid
+import orjson
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-from app.services.openai_service import OpenAIService
-from app.core.logging_config import get_logger, log_request_start, log_request_end, log_error_with_context
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Optional, Dict, Any
+from app.api.schemas import ChatMessage, ChatResponse, ClearChatRequest, BatchChatRequest, BatchChatResponse
+from app.services.openai_service import openai_service, INTERNAL_ERROR_RESPONSE, MAX_TURNS_RESPONSE, SYSTEM_MESSAGE, SYSTEM_PROMPT_HASH
+from app.services.batch_chat_service import BatchChatService
+from app.services.response_cache import ResponseCache
+from app.services import mfee
+from app.core.config import get_settings
+from app.core.logging_config import get_logger, log_request_start, log_request_end, log_request_complete, log_error_with_context
 
 router = APIRouter()
-openai_service = OpenAIService()
 logger = get_logger('app.api.chat')
 
+settings = get_settings()
+response_cache = ResponseCache(
+    client=openai_service.async_client,
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    semantic_enabled=settings.semantic_cache_enabled,
+    similarity_threshold=settings.semantic_cache_threshold,
+    embedding_model=settings.embedding_model
+)
+if settings.semantic_cache_path:
+    response_cache.load(settings.semantic_cache_path)
+batch_chat_service = BatchChatService(
+    client=openai_service.async_client,
+    model=openai_service.model,
+    system_message=SYSTEM_MESSAGE
+)
+
+
+async def _cache_namespace(chat_message: ChatMessage) -> Optional[str]:
+    """
+    Response cache namespace for a message, None if it must not be cached.
 
-class CustomParameter(BaseModel):
-    name: str
-    description: str
-    required: bool = False
-
-
-class CustomTool(BaseModel):
-    name: str
-    endpoint: str
-    description: str
-    parameters: Optional[List[CustomParameter]] = None
-
-
-class ChatMessage(BaseModel):
-    message: str
-    conversation_id: Optional[str] = None
-    filter_tools: Optional[List[str]] = None
-    custom_api: Optional[CustomTool] = None
-
-
-class ChatResponse(BaseModel):
-    response: str
-    conversation_id: str
+    Only messages with the default tool set are cached. The namespace is the model
+    plus a digest of the system prompt and the conversation so far, so a response is
+    only reused for the same message after an identical prompt, and entries saved
+    under an older system prompt are never served.
+    """
+    if not settings.response_cache_enabled or chat_message.filter_tools is not None or chat_message.custom_api is not None:
+        return None
+    history = await openai_service.get_conversation_history(chat_message.conversation_id) if chat_message.conversation_id else None
+    digest = hashlib.blake2b(SYSTEM_PROMPT_HASH.encode(), digest_size=16)
+    if history:
+        digest.update(orjson.dumps(history, default=str, option=orjson.OPT_SORT_KEYS))
+    return f"{openai_service.model}:{digest.hexdigest()}"
 
 
-class ClearChatRequest(BaseModel):
-    conversation_id: Optional[str] = None
+def _sse(payload: Dict[str, Any]) -> bytes:
+    """Encode a server-sent event data frame"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -47,33 +66,43 @@ async def chat_endpoint(chat_message: ChatMessage):
     if filter_tools is not provided, all tools are enabled
     set conversation_id to a specific value to use a specific conversation
     """
-    request_id = log_request_start(logger, "POST", "/api/chat", {
-        "message_length": len(chat_message.message),
-        "conversation_id": chat_message.conversation_id
-    })
+    request_id = log_request_start(logger, "POST", "/api/chat")
 
     try:
-        logger.info(f"💬 Chat API request received")
-        logger.debug(f"📝 Message preview: {chat_message.message[:100]}...")
+        # Empty and oversized messages are rejected by ChatMessage validation (422)
+        # Answer trivial messages without a model call
+        decision = mfee.classify(chat_message.message)
+        if decision.kind == mfee.DIRECT:
+            conversation_id = await openai_service.record_exchange(chat_message.message, decision.response, chat_message.conversation_id)
+            log_request_complete(logger, request_id, "POST /api/chat", 200,
+                                 message_length=len(chat_message.message), response_length=len(decision.response),
+                                 conversation_id=conversation_id, direct=True)
+            return ChatResponse(response=decision.response, conversation_id=conversation_id)
 
-        if not chat_message.message.strip():
-            logger.warning("❌ Empty message received in chat API")
-            log_request_end(logger, request_id, 400)
-            raise HTTPException(status_code=400, detail="Message cannot be empty")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📝 Message preview: %s...", chat_message.message[:100])
 
-        logger.info(f"🔄 Processing chat message via OpenAI service")
-        response, conversation_id = openai_service.chat(chat_message.message, chat_message.conversation_id, chat_message.filter_tools, chat_message.custom_api)
+        cache_namespace = await _cache_namespace(chat_message)
 
-        response_obj = ChatResponse(
-            response=response,
-            conversation_id=conversation_id
-        )
+        if cache_namespace is not None:
+            cached_response = await response_cache.lookup(chat_message.message, cache_namespace)
+            if cached_response is not None:
+                conversation_id = await openai_service.record_exchange(chat_message.message, cached_response, chat_message.conversation_id)
+                log_request_complete(logger, request_id, "POST /api/chat", 200,
+                                     message_length=len(chat_message.message), response_length=len(cached_response),
+                                     conversation_id=conversation_id, cached=True)
+                return ChatResponse(response=cached_response, conversation_id=conversation_id)
 
-        logger.info(f"✅ Chat API request completed successfully")
-        logger.debug(f"📤 Response length: {len(response)}")
-        log_request_end(logger, request_id, 200, {"response_length": len(response), "conversation_id": conversation_id})
+        response, conversation_id = await openai_service.achat(chat_message.message, chat_message.conversation_id, chat_message.filter_tools, chat_message.custom_api)
 
-        return response_obj
+        if cache_namespace is not None and response and response not in (INTERNAL_ERROR_RESPONSE, MAX_TURNS_RESPONSE):
+            await response_cache.put(chat_message.message, response, cache_namespace)
+
+        log_request_complete(logger, request_id, "POST /api/chat", 200,
+                             message_length=len(chat_message.message), response_length=len(response),
+                             conversation_id=conversation_id, cached=False)
+
+        return ChatResponse(response=response, conversation_id=conversation_id)
 
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -81,10 +110,110 @@ async def chat_endpoint(chat_message: ChatMessage):
     except Exception as e:
         log_error_with_context(logger, e, "chat_api_endpoint", {"message": chat_message.message[:100]})
         log_request_end(logger, request_id, 500)
-        logger.error(f"🚨 Chat API error: {str(e)}")
+        logger.error("🚨 Chat API error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
 
 
+@router.post("/chat/stream")
+async def chat_stream_endpoint(chat_message: ChatMessage):
+    """
+    Streaming variant of /chat using server-sent events
+    The first event carries the conversation_id, followed by {"delta": ...} events as the response is generated
+    and a final [DONE] event, preceded by an {"error": ...} event if processing fails
+    """
+    request_id = log_request_start(logger, "POST", "/api/chat/stream")
+
+    decision = mfee.classify(chat_message.message)
+
+    conversation_id = chat_message.conversation_id or str(uuid.uuid4())
+
+    async def event_stream():
+        yield _sse({"conversation_id": conversation_id})
+
+        try:
+            cache_namespace = await _cache_namespace(chat_message) if decision.kind != mfee.DIRECT else None
+            response = decision.response if decision.kind == mfee.DIRECT else None
+            if cache_namespace is not None:
+                response = await response_cache.lookup(chat_message.message, cache_namespace)
+
+            if response is not None:
+                await openai_service.record_exchange(chat_message.message, response, conversation_id)
+                yield _sse({"delta": response})
+            else:
+                parts = []
+                async for delta in openai_service.astream(chat_message.message, conversation_id, chat_message.filter_tools, chat_message.custom_api):
+                    parts.append(delta)
+                    yield _sse({"delta": delta})
+                response = "".join(parts)
+
+                if cache_namespace is not None and response and response not in (INTERNAL_ERROR_RESPONSE, MAX_TURNS_RESPONSE):
+                    await response_cache.put(chat_message.message, response, cache_namespace)
+
+        except Exception as e:
+            # Headers are already sent, report the failure in-band and still end the stream
+            log_error_with_context(logger, e, "chat_stream_endpoint", {"message": chat_message.message[:100]})
+            log_request_end(logger, request_id, 500)
+            logger.error("🚨 Chat stream error: %s", e)
+            yield _sse({"error": f"Error processing message: {str(e)}"})
+            yield b"data: [DONE]\n\n"
+            return
+
+        yield b"data: [DONE]\n\n"
+        log_request_complete(logger, request_id, "POST /api/chat/stream", 200,
+                             message_length=len(chat_message.message), response_length=len(response),
+                             conversation_id=conversation_id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_endpoint(batch_request: BatchChatRequest):
+    """
+    Submit independent single-turn messages to the OpenAI Batch API
+    Batches are processed within 24h at half the price, poll GET /chat/batch/{batch_id} for the responses
+    Tools are not available to batched messages
+    """
+    request_id = log_request_start(logger, "POST", "/api/chat/batch", {"message_count": len(batch_request.messages)})
+
+    if settings.llm_base_url:
+        log_request_end(logger, request_id, 501)
+        raise HTTPException(status_code=501, detail="The Batch API is only available with OpenAI")
+
+    try:
+        batch_id, status = await batch_chat_service.submit(batch_request.messages)
+        log_request_end(logger, request_id, 200, {"batch_id": batch_id})
+        return BatchChatResponse(batch_id=batch_id, status=status)
+
+    except Exception as e:
+        log_error_with_context(logger, e, "chat_batch_endpoint")
+        log_request_end(logger, request_id, 500)
+        logger.error("🚨 Batch submit API error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error submitting batch: {str(e)}")
+
+
+@router.get("/chat/batch/{batch_id}", response_model=BatchChatResponse)
+async def get_chat_batch_endpoint(batch_id: str):
+    """
+    Get the status of a batch, responses are included in submission order once it has completed
+    """
+    request_id = log_request_start(logger, "GET", "/api/chat/batch", {"batch_id": batch_id})
+
+    try:
+        status, responses = await batch_chat_service.results(batch_id)
+        log_request_end(logger, request_id, 200, {"batch_id": batch_id, "status": status})
+        return BatchChatResponse(batch_id=batch_id, status=status, responses=responses)
+
+    except Exception as e:
+        log_error_with_context(logger, e, "get_chat_batch_endpoint")
+        log_request_end(logger, request_id, 500)
+        logger.error("🚨 Batch results API error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error retrieving batch: {str(e)}")
+
+
 @router.post("/chat/clear")
 async def clear_chat_endpoint(clear_request: ClearChatRequest = None):
     """
@@ -95,7 +224,7 @@ async def clear_chat_endpoint(clear_request: ClearChatRequest = None):
 
     try:
         logger.info("🧹 Chat clear request received")
-        openai_service.clear_conversation(conversation_id)
+        await openai_service.clear_conversation(conversation_id)
 
         if conversation_id:
             message = f"Conversation {conversation_id} cleared successfully"
@@ -109,7 +238,7 @@ async def clear_chat_endpoint(clear_request: ClearChatRequest = None):
     except Exception as e:
         log_error_with_context(logger, e, "clear_chat_endpoint")
         log_request_end(logger, request_id, 500)
-        logger.error(f"🚨 Clear chat API error: {str(e)}")
+        logger.error("🚨 Clear chat API error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error clearing conversation: {str(e)}")
 
 
@@ -124,37 +253,38 @@ async def get_chat_history(conversation_id: Optional[str] = None):
         logger.info("📋 Chat history request received")
 
         if conversation_id:
-            history = openai_service.get_conversation_history(conversation_id)
+            history = await openai_service.get_conversation_history(conversation_id)
             message_count = len(history)
         else:
             # Return all conversations
-            all_conversations = openai_service.conversations
-            total_conversations = len(all_conversations)
-            total_messages = sum(len(conv) for conv in all_conversations.values())
+            all_conversations = await openai_service.get_all_conversations()
+            total_conversations = await openai_service.get_conversation_count()
+            total_messages = await openai_service.get_total_message_count()
 
-            logger.info(f"✅ Retrieved all chat history: {total_conversations} conversations, {total_messages} messages")
+            logger.info("✅ Retrieved all chat history: %s conversations, %s messages", total_conversations, total_messages)
             log_request_end(logger, request_id, 200, {"total_conversations": total_conversations, "total_messages": total_messages})
 
-            return {
+            return ORJSONResponse({
                 "conversations": all_conversations,
                 "total_conversations": total_conversations,
                 "total_messages": total_messages
-            }
+            })
 
-        logger.info(f"✅ Retrieved chat history for conversation {conversation_id} with {message_count} messages")
-        logger.debug(f"📊 History preview: {[msg.get('role', 'unknown') for msg in history[:5]]}")
+        logger.info("✅ Retrieved chat history for conversation %s with %s messages", conversation_id, message_count)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📊 History preview: %s", [msg.get('role', 'unknown') for msg in history[:5]])
         log_request_end(logger, request_id, 200, {"message_count": message_count, "conversation_id": conversation_id})
 
-        return {
+        return ORJSONResponse({
             "history": history,
             "message_count": message_count,
             "conversation_id": conversation_id
-        }
+        })
 
     except Exception as e:
         log_error_with_context(logger, e, "get_chat_history_endpoint")
         log_request_end(logger, request_id, 500)
-        logger.error(f"🚨 Get history API error: {str(e)}")
+        logger.error("🚨 Get history API error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error retrieving history: {str(e)}")
 
 
@@ -168,9 +298,9 @@ async def get_conversation_stats():
     try:
         logger.info("📊 Conversation stats request received")
 
-        conversation_count = openai_service.get_conversation_count()
-        total_messages = openai_service.get_total_message_count()
-        conversation_ids = openai_service.list_conversation_ids()
+        conversation_count = await openai_service.get_conversation_count()
+        total_messages = await openai_service.get_total_message_count()
+        conversation_ids = await openai_service.list_conversation_ids()
 
         stats = {
             "total_conversations": conversation_count,
@@ -179,15 +309,15 @@ async def get_conversation_stats():
             "average_messages_per_conversation": round(total_messages / conversation_count, 2) if conversation_count > 0 else 0
         }
 
-        logger.info(f"✅ Retrieved conversation stats: {conversation_count} conversations, {total_messages} messages")
+        logger.info("✅ Retrieved conversation stats: %s conversations, %s messages", conversation_count, total_messages)
         log_request_end(logger, request_id, 200, stats)
 
-        return stats
+        return ORJSONResponse(stats)
 
     except Exception as e:
         log_error_with_context(logger, e, "get_conversation_stats_endpoint")
         log_request_end(logger, request_id, 500)
-        logger.error(f"🚨 Get stats API error: {str(e)}")
+        logger.error("🚨 Get stats API error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error retrieving stats: {str(e)}")
 
 
@@ -201,9 +331,9 @@ async def cleanup_conversations():
     try:
         logger.info("🧹 Conversation cleanup request received")
 
-        cleaned_count = openai_service.cleanup_empty_conversations()
+        cleaned_count = await openai_service.cleanup_empty_conversations()
 
-        logger.info(f"✅ Conversation cleanup completed: {cleaned_count} conversations removed")
+        logger.info("✅ Conversation cleanup completed: %s conversations removed", cleaned_count)
         log_request_end(logger, request_id, 200, {"cleaned_conversations": cleaned_count})
 
         return {"message": f"Cleaned up {cleaned_count} empty conversations", "cleaned_conversations": cleaned_count}
@@ -211,5 +341,5 @@ async def cleanup_conversations():
     except Exception as e:
         log_error_with_context(logger, e, "cleanup_conversations_endpoint")
         log_request_end(logger, request_id, 500)
-        logger.error(f"🚨 Cleanup API error: {str(e)}")
+        logger.error("🚨 Cleanup API error: %s", e)
         raise HTTPException(status_code=500, detail=f"Error during cleanup: {str(e)}")
\ No newline at end of file
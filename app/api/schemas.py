@@ -0,0 +1,46 @@
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, Field, StringConstraints
+from app.core.config import get_settings
+
+
+# Validated by pydantic-core while parsing, empty or oversized messages are rejected with 422
+MessageText = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=get_settings().max_message_chars)]
+
+
+class CustomParameter(BaseModel):
+    name: str
+    description: str
+    required: bool = False
+
+
+class CustomTool(BaseModel):
+    name: str
+    endpoint: str
+    description: str
+    parameters: Optional[List[CustomParameter]] = None
+
+
+class ChatMessage(BaseModel):
+    message: MessageText
+    conversation_id: Optional[str] = None
+    filter_tools: Optional[List[str]] = None
+    custom_api: Optional[CustomTool] = None
+
+
+class ChatResponse(BaseModel):
+    response: str
+    conversation_id: str
+
+
+class ClearChatRequest(BaseModel):
+    conversation_id: Optional[str] = None
+
+
+class BatchChatRequest(BaseModel):
+    messages: Annotated[List[MessageText], Field(min_length=1, max_length=50_000)]
+
+
+class BatchChatResponse(BaseModel):
+    batch_id: str
+    status: str
+    responses: Optional[List[Optional[str]]] = None
@@ -1,20 +1,60 @@
-import os
+from functools import lru_cache
 from typing import Optional
-from pydantic import ConfigDict
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = ConfigDict(env_file=".env", extra="ignore")
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
 
     llm_api_key: str = "test-key"
     llm_base_url: Optional[str] = None
     default_model: str = "gpt-4o"
+    tool_model: Optional[str] = None  # Cheaper model for tool-calling turns (e.g. gpt-4o-mini), final answers use default_model
     openweathermap_api_key: str = "test-weather-key"
     database_url: str = "postgresql://localhost:5432/chatbot_db"
+    # Database connection pool, keep pool_size + max_overflow per worker under the Postgres max_connections
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Reconnect connections older than this, in seconds
     log_level: str = "INFO"
+    request_log_level: str = "DEBUG"  # Level for logs/requests.log, INFO is enough in production
+    log_dir: str = "logs"  # Created on startup if missing
     active_tools: Optional[str] = None  # Comma-separated tool names (e.g., "city,weather")
+    max_message_chars: int = 4000  # Longer chat messages are rejected with 422
+    history_summary_enabled: bool = True  # Summarize turns beyond the prompt window instead of dropping them
+    summary_model: Optional[str] = None  # Model for history summaries, a cheaper one is enough, defaults to default_model
 
+    # In-process conversation store bounds
+    conversation_max_count: int = 10000
+    conversation_ttl_seconds: int = 3600  # Idle conversations are evicted after this
+    redis_url: Optional[str] = None  # Share conversations across workers, e.g. redis://localhost:6379/0
+    redis_max_connections: int = 64  # Connection pool size per worker
 
+    # Server
+    workers: int = 1  # More than one worker disables auto-reload, use REDIS_URL to share conversations
+
+    # Response cache keyed by message and conversation history
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 300
+    response_cache_max_entries: int = 1024
+    semantic_cache_enabled: bool = False  # Requires an embeddings-capable provider
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_path: Optional[str] = None  # .npz file, loaded on startup and saved on shutdown
+    embedding_model: str = "text-embedding-3-small"
+
+    # Async OpenAI request batching and concurrency
+    batch_window_ms: int = 50  # Queued requests arriving within this window are dispatched together, a lone one goes right away
+    batch_max_size: int = 32
+    openai_max_concurrent: int = 50  # Max in-flight OpenAI calls, size to the account rate limits
+    openai_max_attempts: int = 6  # Attempts per call on rate limit, timeout and server errors
+    openai_timeout_seconds: float = 20.0  # Per-call timeout, streamed calls time out between chunks
+    openai_deadline_seconds: float = 30.0  # Overall budget per model call, retries included
+    tool_max_workers: int = 16  # Threads running blocking tool calls, per worker
+    tool_cache_enabled: bool = True  # Reuse successful tool results, TTL per tool (weather 5 min, Wikipedia 24h)
+    tool_cache_max_entries: int = 2048
+
+
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     return Settings()
\ No newline at end of file
@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import get_settings
+from app.models.product import Base, PRODUCT_TSV_EXPRESSION
 from typing import Generator
 
 settings = get_settings()
@@ -8,13 +9,23 @@ settings = get_settings()
 # Create database engine
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
+    pool_pre_ping=True,  # Connections may sit idle during long OpenAI calls
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
     echo=False  # Set to True for SQL query logging
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# create_all() skips existing tables, these bring tables created by earlier versions up to date
+MIGRATIONS = (
+    f"ALTER TABLE products ADD COLUMN IF NOT EXISTS tsv tsvector GENERATED ALWAYS AS ({PRODUCT_TSV_EXPRESSION}) STORED",
+    "CREATE INDEX IF NOT EXISTS products_tsv_idx ON products USING gin (tsv)",
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -29,18 +40,19 @@ def get_db() -> Generator[Session, None, None]:
 
 def create_tables():
     """
-    Create all database tables
+    Create all database tables and migrate existing ones
     """
-    from app.models.product import Base as ProductBase
-    ProductBase.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for statement in MIGRATIONS:
+            connection.execute(text(statement))
 
 
 def drop_tables():
     """
     Drop all database tables
     """
-    from app.models.product import Base as ProductBase
-    ProductBase.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=engine)
 
 
 def reset_database():
@@ -48,4 +60,5 @@ def reset_database():
     Reset database by dropping and recreating all tables
     """
     drop_tables()
-    create_tables()
\ No newline at end of file
+    # Tables were just dropped, skip the per-table existence checks
+    Base.metadata.create_all(bind=engine, checkfirst=False)
\ No newline at end of file
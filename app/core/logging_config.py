@@ -1,7 +1,13 @@
+import atexit
+import itertools
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue
 import sys
-from datetime import datetime
+import orjson
+from pathlib import Path
 from typing import Dict, Any
 from app.core.config import get_settings
 
@@ -9,22 +15,38 @@ from app.core.config import get_settings
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors for different log levels"""
 
-    # Color codes
-    COLORS = {
-        'DEBUG': '\033[36m',    # Cyan
-        'INFO': '\033[32m',     # Green
-        'WARNING': '\033[33m',  # Yellow
-        'ERROR': '\033[31m',    # Red
-        'CRITICAL': '\033[35m', # Magenta
-        'RESET': '\033[0m'      # Reset
+    # Level names with their color codes applied, computed once
+    COLORED_LEVELS = {
+        'DEBUG': '\033[36mDEBUG\033[0m',        # Cyan
+        'INFO': '\033[32mINFO\033[0m',          # Green
+        'WARNING': '\033[33mWARNING\033[0m',    # Yellow
+        'ERROR': '\033[31mERROR\033[0m',        # Red
+        'CRITICAL': '\033[35mCRITICAL\033[0m'   # Magenta
     }
 
-    def format(self, record):
-        # Add color to level name
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.COLORS['RESET']}"
+    def formatMessage(self, record):
+        # Substitute the colored level name without mutating the record other handlers format
+        colored = self.COLORED_LEVELS.get(record.levelname)
+        if colored is None:
+            return super().formatMessage(record)
+        return self._style._fmt % {**record.__dict__, 'levelname': colored}
+
+
+class OrjsonFormatter(logging.Formatter):
+    """Formatter that writes each record as one JSON line, escaped correctly by orjson"""
 
-        return super().format(record)
+    def format(self, record):
+        entry = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
 
 
 class RequestResponseFilter(logging.Filter):
@@ -34,16 +56,80 @@ class RequestResponseFilter(logging.Filter):
         return hasattr(record, 'request_id') or hasattr(record, 'response_data')
 
 
+class RoutingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that enqueues records together with the handlers they are routed to"""
+
+    def __init__(self, log_queue, targets):
+        super().__init__(log_queue)
+        self.targets = targets
+        # Skip enqueueing records that none of the target handlers would emit
+        self.setLevel(min(handler.level for handler in targets))
+
+    def prepare(self, record):
+        # Hand the record over as is, the default formats it in the calling thread and drops exc_info
+        # which the JSON formatter needs, the target handlers format it on the listener thread
+        return record
+
+    def enqueue(self, record):
+        self.queue.put_nowait((record, self.targets))
+
+
+class RoutingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that hands each record to the handlers it was routed to"""
+
+    def handle(self, item):
+        record, targets = item
+        for handler in targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+_queue_listener = None
+_configured = False
+
+
+def _install_queue_handlers():
+    """Replace each configured logger's handlers with a queue handler drained by a background thread"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+    log_queue = queue.SimpleQueue()
+    logger_names = [''] + list(logging.root.manager.loggerDict)
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        if isinstance(logger, logging.PlaceHolder) or not logger.handlers:
+            continue
+        logger.handlers = [RoutingQueueHandler(log_queue, tuple(logger.handlers))]
+
+    _queue_listener = RoutingQueueListener(log_queue)
+    _queue_listener.start()
+
+
+def _stop_queue_listener():
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+
+atexit.register(_stop_queue_listener)
+
+
 def setup_logging():
-    """Setup logging configuration based on environment settings"""
+    """Setup logging configuration based on environment settings, only the first call configures"""
+    global _configured
+    if _configured:
+        return logging.getLogger('app')
+
     settings = get_settings()
     log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
+    request_log_level = getattr(logging, settings.request_log_level.upper(), logging.DEBUG)
 
     # Create logs directory if it doesn't exist
-    import os
-    log_dir = "logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    log_dir = Path(settings.log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    # ANSI colors only help on a terminal, not when stdout is redirected to a file or journald
+    console_formatter = 'colored' if sys.stdout.isatty() else 'plain'
 
     # Logging configuration
     config = {
@@ -63,8 +149,12 @@ def setup_logging():
                 'format': '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
                 'datefmt': '%H:%M:%S'
             },
+            'plain': {
+                'format': '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+                'datefmt': '%H:%M:%S'
+            },
             'json': {
-                'format': '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", "function": "%(funcName)s", "line": %(lineno)d, "message": "%(message)s"}',
+                '()': OrjsonFormatter,
                 'datefmt': '%Y-%m-%d %H:%M:%S'
             }
         },
@@ -77,14 +167,14 @@ def setup_logging():
             'console': {
                 'class': 'logging.StreamHandler',
                 'level': log_level,
-                'formatter': 'colored',
+                'formatter': console_formatter,
                 'stream': sys.stdout
             },
             'file_all': {
                 'class': 'logging.handlers.RotatingFileHandler',
                 'level': logging.DEBUG,
                 'formatter': 'detailed',
-                'filename': f'{log_dir}/chatbot.log',
+                'filename': str(log_dir / 'chatbot.log'),
                 'maxBytes': 10485760,  # 10MB
                 'backupCount': 5
             },
@@ -92,7 +182,7 @@ def setup_logging():
                 'class': 'logging.handlers.RotatingFileHandler',
                 'level': logging.ERROR,
                 'formatter': 'detailed',
-                'filename': f'{log_dir}/errors.log',
+                'filename': str(log_dir / 'errors.log'),
                 'maxBytes': 10485760,  # 10MB
                 'backupCount': 3
             },
@@ -100,15 +190,15 @@ def setup_logging():
                 'class': 'logging.handlers.RotatingFileHandler',
                 'level': logging.INFO,
                 'formatter': 'detailed',
-                'filename': f'{log_dir}/tools.log',
+                'filename': str(log_dir / 'tools.log'),
                 'maxBytes': 5242880,  # 5MB
                 'backupCount': 3
             },
             'file_requests': {
                 'class': 'logging.handlers.RotatingFileHandler',
-                'level': logging.DEBUG,
+                'level': request_log_level,
                 'formatter': 'json',
-                'filename': f'{log_dir}/requests.log',
+                'filename': str(log_dir / 'requests.log'),
                 'maxBytes': 10485760,  # 10MB
                 'backupCount': 5
             }
@@ -126,9 +216,10 @@ def setup_logging():
                 'handlers': ['console', 'file_all'],
                 'propagate': False
             },
+            # Service and API records are written once, as JSON; errors also go to errors.log
             'app.services': {
                 'level': logging.DEBUG,
-                'handlers': ['console', 'file_all', 'file_requests'],
+                'handlers': ['console', 'file_requests', 'file_errors'],
                 'propagate': False
             },
             'app.tools': {
@@ -138,7 +229,7 @@ def setup_logging():
             },
             'app.api': {
                 'level': logging.INFO,
-                'handlers': ['console', 'file_all', 'file_requests'],
+                'handlers': ['console', 'file_requests', 'file_errors'],
                 'propagate': False
             },
             'app.chat': {
@@ -176,11 +267,15 @@ def setup_logging():
     }
 
     logging.config.dictConfig(config)
+    _configured = True
+
+    # File and console writes happen on the listener thread, off the request path
+    _install_queue_handlers()
 
     # Log startup info
     logger = logging.getLogger('app')
     logger.info(f"🚀 Logging initialized with level: {settings.log_level}")
-    logger.info(f"📁 Log files location: {os.path.abspath(log_dir)}/")
+    logger.info(f"📁 Log files location: {log_dir.resolve()}/")
 
     return logger
 
@@ -190,37 +285,58 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+def _dumps(data: Any) -> str:
+    """Serialize log payloads with orjson, falling back to str() for unsupported types"""
+    return orjson.dumps(data, default=str).decode()
+
+
+# Request ids are a per-process prefix plus a counter, unique across workers and cheap to generate
+_request_counter = itertools.count(1)
+_request_id_prefix = f"{os.getpid():x}"
+
+
 def log_request_start(logger: logging.Logger, method: str, endpoint: str, data: Any = None):
     """Log the start of a request"""
-    request_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    logger.debug(f"🔵 REQUEST START [{request_id}] {method} {endpoint}",
+    request_id = f"{_request_id_prefix}-{next(_request_counter):x}"
+    logger.debug("🔵 REQUEST START [%s] %s %s", request_id, method, endpoint,
                  extra={'request_id': request_id, 'method': method, 'endpoint': endpoint})
     if data and logger.isEnabledFor(logging.DEBUG):
-        logger.debug(f"📝 REQUEST DATA [{request_id}]: {data}", extra={'request_id': request_id})
+        logger.debug("📝 REQUEST DATA [%s]: %s", request_id, _dumps(data), extra={'request_id': request_id})
     return request_id
 
 
 def log_request_end(logger: logging.Logger, request_id: str, status_code: int = None, response_data: Any = None):
     """Log the end of a request"""
-    status_emoji = "✅" if (status_code and 200 <= status_code < 300) else "❌" if status_code else "🔵"
-    status_text = f" [{status_code}]" if status_code else ""
-    logger.debug(f"{status_emoji} REQUEST END [{request_id}]{status_text}",
-                 extra={'request_id': request_id, 'status_code': status_code})
+    if logger.isEnabledFor(logging.DEBUG):
+        status_emoji = "✅" if (status_code and 200 <= status_code < 300) else "❌" if status_code else "🔵"
+        status_text = f" [{status_code}]" if status_code else ""
+        logger.debug("%s REQUEST END [%s]%s", status_emoji, request_id, status_text,
+                     extra={'request_id': request_id, 'status_code': status_code})
     if response_data and logger.isEnabledFor(logging.DEBUG):
-        logger.debug(f"📤 RESPONSE DATA [{request_id}]: {response_data}",
+        logger.debug("📤 RESPONSE DATA [%s]: %s", request_id, _dumps(response_data),
                      extra={'request_id': request_id, 'response_data': response_data})
 
 
+def log_request_complete(logger: logging.Logger, request_id: str, endpoint: str, status_code: int = 200, **fields: Any):
+    """Log a single structured INFO record summarizing a completed request"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info("✅ REQUEST COMPLETE [%s] %s [%s] %s", request_id, endpoint, status_code, _dumps(fields),
+                extra={'request_id': request_id, 'status_code': status_code, **fields})
+
+
 def log_tool_call(logger: logging.Logger, tool_name: str, function_name: str, args: Dict[str, Any]):
     """Log a tool function call"""
-    logger.info(f"🔧 TOOL CALL: {tool_name}.{function_name}({args})")
+    logger.info("🔧 TOOL CALL: %s.%s(%s)", tool_name, function_name, args)
 
 
 def log_tool_result(logger: logging.Logger, tool_name: str, function_name: str, success: bool, result_length: int = None):
     """Log a tool function result"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     status_emoji = "✅" if success else "❌"
     result_info = f" (response length: {result_length})" if result_length else ""
-    logger.info(f"{status_emoji} TOOL RESULT: {tool_name}.{function_name}{result_info}")
+    logger.info("%s TOOL RESULT: %s.%s%s", status_emoji, tool_name, function_name, result_info)
 
 
 def log_error_with_context(logger: logging.Logger, error: Exception, context: str, extra_data: Dict[str, Any] = None):
@@ -238,13 +354,9 @@ def log_error_with_context(logger: logging.Logger, error: Exception, context: st
             else:
                 error_data[f'user_{key}'] = value  # Prefix with 'user_' to avoid conflicts
 
-    logger.error(f"💥 ERROR in {context}: {type(error).__name__}: {error}", extra=error_data)
+    logger.error("💥 ERROR in %s: %s: %s", context, type(error).__name__, error, extra=error_data)
 
     # Log stack trace at debug level
     if logger.isEnabledFor(logging.DEBUG):
         import traceback
-        logger.debug(f"📚 STACK TRACE for {context}:\n{traceback.format_exc()}")
-
-
-# Initialize logging on module import
-setup_logging()
\ No newline at end of file
+        logger.debug("📚 STACK TRACE for %s:\n%s", context, traceback.format_exc())
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DECIMAL, DateTime, Boolean, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.sql import func
 from pydantic import BaseModel, ConfigDict
@@ -7,6 +8,13 @@ from decimal import Decimal
 from datetime import datetime
 
 
+# Full-text search document of a product, shared by the model and the migration in create_tables()
+PRODUCT_TSV_EXPRESSION = (
+    "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || "
+    "coalesce(category, '') || ' ' || coalesce(brand, ''))"
+)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -25,6 +33,12 @@ class Product(Base):
     stock_quantity = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Full-text search document, generated by Postgres and backed by a GIN index
+    tsv = Column(TSVECTOR, Computed(PRODUCT_TSV_EXPRESSION, persisted=True))
+
+    __table_args__ = (
+        Index('products_tsv_idx', 'tsv', postgresql_using='gin'),
+    )
 
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', price={self.price})>"
@@ -0,0 +1,95 @@
+import asyncio
+from typing import List, Optional, Tuple
+import orjson
+from app.core.logging_config import get_logger
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+# Terminal states that will never produce an output file
+FAILED_STATUSES = {"failed", "expired", "cancelled"}
+
+
+class BatchChatService:
+    """
+    Offline chat through the OpenAI Batch API.
+
+    Messages are written as one JSONL request per line, uploaded as a single
+    batch file and processed asynchronously by OpenAI within the completion
+    window at half the price of synchronous calls. Each request is a single
+    turn with the system prompt only: batch results come back all at once, so
+    tool calls could not be executed and fed back to the model.
+    """
+
+    def __init__(self, client, model: str, system_message: dict,
+                 poll_interval: float = 5.0, max_poll_interval: float = 300.0):
+        self.client = client
+        self.model = model
+        self.system_message = system_message
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.logger = get_logger('app.services.batch_chat')
+
+    def _build_input(self, messages: List[str]) -> bytes:
+        return b"\n".join(
+            orjson.dumps({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": self.model,
+                    "messages": [self.system_message, {"role": "user", "content": message}]
+                }
+            })
+            for index, message in enumerate(messages)
+        )
+
+    async def submit(self, messages: List[str]) -> Tuple[str, str]:
+        """Upload the messages as a batch and return its id and status"""
+        batch_file = await self.client.files.create(file=("batch.jsonl", self._build_input(messages)), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=COMPLETION_WINDOW
+        )
+        self.logger.info("📦 Submitted batch %s with %d request(s)", batch.id, len(messages))
+        return batch.id, batch.status
+
+    async def results(self, batch_id: str) -> Tuple[str, Optional[List[Optional[str]]]]:
+        """
+        Return the batch status and, once completed, the responses in submission order.
+        Requests that failed inside a completed batch have a None response.
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            return batch.status, None
+
+        total = batch.request_counts.total if batch.request_counts else 0
+        responses: List[Optional[str]] = [None] * total
+        if batch.output_file_id:
+            output = await self.client.files.content(batch.output_file_id)
+            for line in output.content.splitlines():
+                result = orjson.loads(line)
+                index = int(result["custom_id"])
+                body = (result.get("response") or {}).get("body") or {}
+                choices = body.get("choices") or []
+                if choices:
+                    if index >= len(responses):
+                        responses.extend([None] * (index + 1 - len(responses)))
+                    responses[index] = choices[0]["message"].get("content")
+
+        self.logger.info("✅ Batch %s completed with %d response(s)", batch_id, sum(r is not None for r in responses))
+        return batch.status, responses
+
+    async def run(self, messages: List[str]) -> List[Optional[str]]:
+        """Submit the messages and poll with exponential backoff until the batch completes"""
+        batch_id, _ = await self.submit(messages)
+        delay = self.poll_interval
+        while True:
+            status, responses = await self.results(batch_id)
+            if responses is not None:
+                return responses
+            if status in FAILED_STATUSES:
+                raise RuntimeError(f"Batch {batch_id} {status}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
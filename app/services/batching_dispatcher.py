@@ -0,0 +1,158 @@
+import asyncio
+import random
+from typing import Any, Dict, List, Optional, Set, Tuple
+from openai import RateLimitError, APIConnectionError, InternalServerError
+from app.core.logging_config import get_logger
+
+
+# Transient errors worth retrying, APITimeoutError is a subclass of APIConnectionError
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+
+class SlotStream:
+    """Streamed response that frees its concurrency slot once, when it is drained or closed"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    def _free(self):
+        if not self._released:
+            self._released = True
+            self._release()
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            self._free()
+
+    async def close(self):
+        self._free()
+        await self._stream.close()
+
+
+class BatchingDispatcher:
+    """
+    Micro-batcher for chat completion requests.
+
+    Requests submitted within a short window are collected from a queue and
+    fired together with asyncio.gather over the shared AsyncOpenAI client, so
+    bursts reuse the same pooled connections. A lone request is sent right away,
+    the window only applies while more requests are already queued. A semaphore
+    caps the number of in-flight OpenAI calls to stay under the account rate
+    limits, streamed calls hold their slot until the stream is drained or closed.
+    Transient failures (429s, timeouts, 5xx) are retried with jittered exponential backoff
+    within an overall deadline per call, so retries can't stretch a stuck call into minutes.
+    """
+
+    def __init__(self, client, max_batch_size: int = 32, window_ms: int = 50, max_concurrent: int = 50,
+                 max_attempts: int = 6, backoff_min: float = 1.0, backoff_max: float = 30.0,
+                 deadline_seconds: float = 30.0):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_ms / 1000
+        self.max_concurrent = max_concurrent
+        self.max_attempts = max_attempts
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.deadline_seconds = deadline_seconds
+        self.logger = get_logger('app.services.batching_dispatcher')
+
+        # Bound to the running event loop on first use
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Future] = set()
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._worker = loop.create_task(self._run())
+
+    async def submit(self, **kwargs) -> Any:
+        """Queue a chat completion request and wait for its response"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((kwargs, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        # Nothing else is waiting, don't delay a lone request for the window
+        if self._queue.empty():
+            return batch
+        deadline = self._loop.time() + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            self.logger.debug("📦 Dispatching batch of %s completion request(s)", len(batch))
+            # Don't wait for the batch to finish before collecting the next one
+            dispatch = asyncio.gather(*(self._dispatch(kwargs, future) for kwargs, future in batch))
+            self._inflight.add(dispatch)
+            dispatch.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, kwargs: Dict[str, Any], future: asyncio.Future):
+        if future.cancelled():
+            return
+        try:
+            response = await self._create_with_retry(kwargs)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(response)
+        elif isinstance(response, SlotStream):
+            # The submitter is gone (e.g. the client disconnected), free the slot and the HTTP stream
+            await response.close()
+
+    def _backoff(self, attempt: int) -> float:
+        """Random exponential backoff ("full jitter") for the given attempt number"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_min * 2 ** attempt))
+
+    async def _create(self, kwargs: Dict[str, Any]) -> Any:
+        """Single create call holding a concurrency slot, a stream keeps it until it is drained or closed"""
+        await self._semaphore.acquire()
+        try:
+            response = await self.client.chat.completions.create(**kwargs)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        if kwargs.get("stream"):
+            return SlotStream(response, self._semaphore.release)
+        self._semaphore.release()
+        return response
+
+    async def _create_with_retry(self, kwargs: Dict[str, Any]) -> Any:
+        attempt = 0
+        deadline = self._loop.time() + self.deadline_seconds
+        while True:
+            try:
+                # Raises TimeoutError once the deadline passes, which is not retried
+                return await asyncio.wait_for(self._create(kwargs), deadline - self._loop.time())
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                delay = self._backoff(attempt)
+                if attempt >= self.max_attempts or self._loop.time() + delay >= deadline:
+                    raise
+                self.logger.warning("⚠️ OpenAI call failed (%s), retry %s/%s in %.2fs", type(e).__name__, attempt, self.max_attempts - 1, delay)
+                # Sleep outside the semaphore so waiting retries don't hold a slot
+                await asyncio.sleep(delay)
@@ -0,0 +1,167 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+
+class ConversationStore:
+    """
+    In-process conversation store bounded by capacity (LRU) and idle time (TTL).
+
+    Conversations are kept in access order, so the least recently used and the
+    longest idle conversations are always at the front. A running message count
+    is maintained on every write and eviction so totals are O(1), and the list of
+    conversation ids is cached until a conversation is added or removed.
+
+    On overflow the victim is chosen with an expected-tail LRU (ET-LRU) score
+    among the oldest EVICTION_CANDIDATES entries: exp(-Δt / ttl) * (1 + log1p(length)),
+    i.e. recency weighted by how likely a conversation is to continue.
+
+    The API is async to match RedisConversationStore, the in-process operations
+    themselves never wait.
+    """
+
+    EVICTION_CANDIDATES = 16
+
+    def __init__(self, max_conversations: int = 10_000, ttl_seconds: int = 3600):
+        self.max_conversations = max_conversations
+        self.ttl_seconds = ttl_seconds
+        self._conversations: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        # Running summary per conversation: (history index covered, summary), removed with the conversation
+        self._summaries: Dict[str, Tuple[int, str]] = {}
+        self._total_messages = 0
+        # Bumped on every structural change (conversation added or removed)
+        self._version = 0
+        self._ids_version = -1
+        self._ids: List[str] = []
+
+    def _remove(self, conversation_id: str) -> List[Dict[str, Any]]:
+        history = self._conversations.pop(conversation_id)
+        del self._last_access[conversation_id]
+        self._summaries.pop(conversation_id, None)
+        self._total_messages -= len(history)
+        self._version += 1
+        return history
+
+    def _evict_expired(self, now: float):
+        while self._conversations:
+            oldest_id = next(iter(self._conversations))
+            if now - self._last_access[oldest_id] < self.ttl_seconds:
+                break
+            self._remove(oldest_id)
+
+    def _evict_one(self, now: float):
+        candidates = []
+        for conversation_id in self._conversations:
+            candidates.append(conversation_id)
+            if len(candidates) == self.EVICTION_CANDIDATES:
+                break
+
+        def score(conversation_id: str) -> float:
+            idle = now - self._last_access[conversation_id]
+            tail_weight = 1.0 + math.log1p(len(self._conversations[conversation_id]))
+            return math.exp(-idle / self.ttl_seconds) * tail_weight
+
+        self._remove(min(candidates, key=score))
+
+    def _touch(self, conversation_id: str, now: float):
+        self._conversations.move_to_end(conversation_id)
+        self._last_access[conversation_id] = now
+
+    async def contains(self, conversation_id: str) -> bool:
+        """Return whether the conversation exists and has not expired"""
+        last_access = self._last_access.get(conversation_id)
+        return last_access is not None and time.monotonic() - last_access < self.ttl_seconds
+
+    async def count(self) -> int:
+        """Return the number of conversations"""
+        self._evict_expired(time.monotonic())
+        return len(self._conversations)
+
+    async def get(self, conversation_id: str, default=None) -> Optional[List[Dict[str, Any]]]:
+        """Return the conversation history and mark it as recently used"""
+        now = time.monotonic()
+        self._evict_expired(now)
+        if conversation_id not in self._conversations:
+            return default
+        self._touch(conversation_id, now)
+        return self._conversations[conversation_id]
+
+    async def get_or_create(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Return the conversation history, creating an empty one if needed"""
+        history = await self.get(conversation_id)
+        if history is not None:
+            return history
+
+        now = time.monotonic()
+        while self._conversations and len(self._conversations) >= self.max_conversations:
+            self._evict_one(now)
+        self._conversations[conversation_id] = []
+        self._last_access[conversation_id] = now
+        self._version += 1
+        return self._conversations[conversation_id]
+
+    async def append(self, conversation_id: str, message: Dict[str, Any]):
+        """Append a message to a conversation"""
+        (await self.get_or_create(conversation_id)).append(message)
+        self._total_messages += 1
+
+    async def extend(self, conversation_id: str, messages: List[Dict[str, Any]]):
+        """Append several messages to a conversation"""
+        (await self.get_or_create(conversation_id)).extend(messages)
+        self._total_messages += len(messages)
+
+    async def get_summary(self, conversation_id: str) -> Optional[Tuple[int, str]]:
+        """Return the running summary as (history index covered, summary), None if there is none"""
+        return self._summaries.get(conversation_id)
+
+    async def set_summary(self, conversation_id: str, covered: int, summary: str):
+        """Store the running summary of an existing conversation"""
+        if conversation_id in self._conversations:
+            self._summaries[conversation_id] = (covered, summary)
+
+    async def pop(self, conversation_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Remove a conversation and return its history"""
+        if conversation_id not in self._conversations:
+            return None
+        return self._remove(conversation_id)
+
+    async def clear(self):
+        """Remove all conversations"""
+        self._conversations.clear()
+        self._last_access.clear()
+        self._summaries.clear()
+        self._total_messages = 0
+        self._version += 1
+
+    async def keys(self) -> List[str]:
+        """Return the conversation ids in access order"""
+        self._evict_expired(time.monotonic())
+        return list(self._conversations.keys())
+
+    async def ids(self) -> List[str]:
+        """Return the conversation ids, cached until a conversation is added or removed (read-only)"""
+        self._evict_expired(time.monotonic())
+        if self._ids_version != self._version:
+            self._ids = list(self._conversations.keys())
+            self._ids_version = self._version
+        return self._ids
+
+    async def items(self) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Return a snapshot of (conversation id, history) pairs"""
+        self._evict_expired(time.monotonic())
+        return list(self._conversations.items())
+
+    async def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return a plain dict snapshot of all conversations"""
+        self._evict_expired(time.monotonic())
+        return dict(self._conversations)
+
+    async def total_messages(self) -> int:
+        """Return the number of messages across all conversations"""
+        self._evict_expired(time.monotonic())
+        return self._total_messages
+
+    async def aclose(self):
+        """Nothing to release, present for parity with RedisConversationStore"""
@@ -0,0 +1,46 @@
+import unicodedata
+from typing import NamedTuple, Optional
+
+
+# Decision kinds
+DIRECT = "direct"    # Answer with a canned response, no model call
+RENDER = "render"    # Hand the message to the model
+
+GREETINGS = {
+    "hi", "hello", "hey", "hiya", "howdy", "yo", "greetings",
+    "good morning", "good afternoon", "good evening",
+    "hi there", "hello there", "hey there",
+}
+
+GREETING_RESPONSE = (
+    "👋 Hello! I can help you with information about cities, weather, research topics and products. "
+    "What would you like to know?"
+)
+CLARIFY_RESPONSE = (
+    "Could you tell me a bit more about what you're looking for? "
+    "I can help with cities, weather, research topics and products."
+)
+
+
+class Decision(NamedTuple):
+    kind: str
+    response: Optional[str] = None
+
+
+def _text_only(message: str) -> str:
+    """Drop emoji, punctuation and symbols, keeping letters, digits and single spaces"""
+    kept = "".join(ch if unicodedata.category(ch)[0] in "LN" else " " for ch in message)
+    return " ".join(kept.split()).casefold()
+
+
+def classify(message: str) -> Decision:
+    """Decide whether a message needs the model or can be answered directly"""
+    # Message length is enforced by the request schema (422) before this runs
+    text = _text_only(message)
+    if len(text) <= 1:
+        return Decision(DIRECT, CLARIFY_RESPONSE)
+
+    if text in GREETINGS:
+        return Decision(DIRECT, GREETING_RESPONSE)
+
+    return Decision(RENDER)
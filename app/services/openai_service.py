@@ -1,43 +1,168 @@
-import json
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import operator
+import threading
 import uuid
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, AsyncIterator
+import httpx
+import orjson
+from openai import AsyncOpenAI
 from app.core.config import get_settings
 from app.core.logging_config import get_logger, log_request_start, log_request_end, log_tool_call, log_tool_result, log_error_with_context
 from app.tools.registry import get_tool_registry
 from app.tools.custom_api_tool import CustomAPITool
+from app.services.conversation_store import ConversationStore
+from app.services.batching_dispatcher import BatchingDispatcher
+
+
+INTERNAL_ERROR_RESPONSE = "Sorry, I encountered an internal error. Please try again later."
+MAX_TURNS_RESPONSE = "I apologize, but I reached the maximum number of processing steps. Please try rephrasing your request."
+
+# Prompt compaction: older messages beyond the verbatim window are trimmed before sending
+VERBATIM_TURNS = 5
+MAX_PROMPT_TURNS = 20  # Older user turns are not sent at all
+ARCHIVE_AFTER_MESSAGES = 30
+LARGE_TOOL_RESULT_CHARS = 2000
+ARCHIVED_CONTENT = "[archived]"
+
+# Turns dropped from the prompt window are folded into a running summary, refreshed
+# once this many unsummarized turns have accumulated to keep the summary calls rare
+SUMMARY_BATCH_TURNS = 5
+SUMMARY_PROMPT = (
+    "Summarize the conversation below for the assistant that will continue it. "
+    "Keep names, places, products, numbers and any user preferences. Be concise."
+)
+
+# Fields copied from SDK tool call objects into the conversation history
+_tool_call_fields = operator.attrgetter('id', 'type', 'function.name', 'function.arguments')
+
+# Prepared tool schemas are cached per (filter_tools, custom_api) combination
+TOOLS_CACHE_SIZE = 256
+
+# Static system prompt, kept byte-identical across requests so provider-side prompt
+# caching can reuse the prefix. Per-request tool availability is sent after it.
+SYSTEM_PROMPT = """You are a helpful chatbot that can assist users with:
+    - Information about cities (using Wikipedia)
+    - Weather information for cities
+    - Research topics and academic information
+    - Product searches from our database
+
+Always greet users warmly and be helpful. Use the available functions when appropriate to provide accurate information.
+If you don't have the information, inform the user that you don't have the information and try to suggest other ways to get the information.
+If the function returns an error, inform the user about the nature of the error, e.g. rate limit, timeout, internal server error, etc.
+While using get_city_info function, add the url of the wikipedia page to response.
+If the tool you need to use is not enabled, inform the user that the tool is not enabled and suggest to activate it in the tool selection section.
+"""
+SYSTEM_PROMPT_HASH = hashlib.sha256(SYSTEM_PROMPT.encode()).hexdigest()
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+TOOL_CAPABILITIES = {
+    'get_city_info': 'Information about cities (using Wikipedia)',
+    'get_weather': 'Weather information for cities',
+    'search_research': 'Research topics and academic information',
+    'find_products': 'Product searches from our database',
+}
+
+# filter_tools names accepted by the API, mapped to the function they enable
+TOOL_NAME_MAPPING = {
+    'city': 'get_city_info',
+    'weather': 'get_weather',
+    'research': 'search_research',
+    'product': 'find_products'
+}
+
+
+# Shared HTTP client so concurrent chats reuse pooled keep-alive connections
+# HTTP/2 multiplexes concurrent requests over one connection, used when h2 is installed
+_http2 = importlib.util.find_spec("h2") is not None
+_async_http_client = httpx.AsyncClient(
+    http2=_http2,
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    limits=httpx.Limits(max_connections=2000, max_keepalive_connections=1500)
+)
+
+
+async def aclose_http_clients():
+    """Close the shared async HTTP client, called on application shutdown"""
+    await _async_http_client.aclose()
 
 
 class OpenAIService:
     _instance = None
     _initialized = False
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(OpenAIService, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(OpenAIService, cls).__new__(cls)
         return cls._instance
 
     def __init__(self):
         if OpenAIService._initialized:
             return
 
+        with OpenAIService._lock:
+            if OpenAIService._initialized:
+                return
+            self._initialize()
+            OpenAIService._initialized = True
+
+    def _initialize(self):
         settings = get_settings()
-        self.client = OpenAI(
+        self.async_client = AsyncOpenAI(
             api_key=settings.llm_api_key,
-            base_url=settings.llm_base_url if settings.llm_base_url else None
+            base_url=settings.llm_base_url if settings.llm_base_url else None,
+            http_client=_async_http_client,
+            # Retries are handled by the dispatcher with jittered backoff
+            max_retries=0
+        )
+        self.dispatcher = BatchingDispatcher(
+            self.async_client,
+            max_batch_size=settings.batch_max_size,
+            window_ms=settings.batch_window_ms,
+            max_concurrent=settings.openai_max_concurrent,
+            max_attempts=settings.openai_max_attempts,
+            deadline_seconds=settings.openai_deadline_seconds
         )
+        self.tool_executor = ThreadPoolExecutor(max_workers=settings.tool_max_workers, thread_name_prefix="tool")
         self.model = settings.default_model
-        self.conversations: Dict[str, List[Dict[str, Any]]] = {}
+        # Optional cheaper model for turns that only decide on tool calls
+        self.tool_model = settings.tool_model
+        self.request_timeout = settings.openai_timeout_seconds
+        self._use_prompt_cache_key = not settings.llm_base_url
+        self._prefix_ids: Dict[tuple, str] = {}
+        self._tools_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self._summaries_enabled = settings.history_summary_enabled
+        self.summary_model = settings.summary_model or settings.default_model
+        if settings.redis_url:
+            # Shared by all uvicorn workers, the redis client is only required when configured
+            from app.services.redis_conversation_store import RedisConversationStore
+            self.conversations = RedisConversationStore(
+                settings.redis_url,
+                max_conversations=settings.conversation_max_count,
+                ttl_seconds=settings.conversation_ttl_seconds,
+                max_connections=settings.redis_max_connections
+            )
+        else:
+            self.conversations = ConversationStore(
+                max_conversations=settings.conversation_max_count,
+                ttl_seconds=settings.conversation_ttl_seconds
+            )
         self.logger = get_logger('app.services.openai')
 
         # Initialize tool registry
         self.tool_registry = get_tool_registry()
         registry_info = self.tool_registry.get_registry_info()
-        self.logger.info(f"🤖 OpenAI service initialized with model: {self.model}")
-        self.logger.info(f"🔧 Tool registry loaded: {registry_info['total_active']}/{registry_info['total_discovered']} tools active")
-        self.logger.debug(f"🛠️ Active tools: {registry_info['active_tools']}")
-
-        OpenAIService._initialized = True
+        self.logger.info("🤖 OpenAI service initialized with model: %s", self.model)
+        self.logger.info("🔧 Tool registry loaded: %s/%s tools active", registry_info['total_active'], registry_info['total_discovered'])
+        self.logger.debug("🛠️ Active tools: %s", registry_info['active_tools'])
 
     def get_available_functions(self) -> Dict[str, Any]:
         """Get available functions from the tool registry"""
@@ -53,273 +178,624 @@ class OpenAIService:
 
         # Filter tools based on the array of tool names
         filtered_tools = []
-        tool_name_mapping = {
-            'city': 'get_city_info',
-            'weather': 'get_weather',
-            'research': 'search_research',
-            'product': 'find_products'
-        }
-
         for tool_type in filter_tools:
-            if tool_type in tool_name_mapping:
-                function_name = tool_name_mapping[tool_type]
-                for tool in all_tools:
-                    if tool.get('function', {}).get('name') == function_name:
-                        filtered_tools.append(tool)
-                        break
+            definition = self.tool_registry.get_openai_tool_definition(TOOL_NAME_MAPPING.get(tool_type))
+            if definition is not None:
+                filtered_tools.append(definition)
 
         return filtered_tools
 
-    def chat(self, user_message: str, conversation_id: Optional[str] = None, filter_tools=None, custom_api=None) -> tuple[str, str]:
-        """Process user message and return AI response with multi-turn tool calling"""
+    async def _begin_chat(self, user_message: str, conversation_id: Optional[str]) -> tuple[str, str]:
+        """Resolve the conversation, log the request and append the user message"""
         # Generate conversation_id if not provided
         if conversation_id is None:
             conversation_id = str(uuid.uuid4())
 
-        # Initialize conversation if it doesn't exist
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
-
         request_id = log_request_start(self.logger, "CHAT", "OpenAI", {
             "message": user_message[:100] + "..." if len(user_message) > 100 else user_message,
             "conversation_id": conversation_id
         })
 
-        try:
-            conversation_history = self.conversations[conversation_id]
-            self.logger.debug(f"💬 USER INPUT [{request_id}]: {user_message}")
-            self.logger.info(f"🧠 Processing chat message for conversation {conversation_id} with {len(conversation_history)} previous messages")
-
-            # Add user message to conversation history
-            conversation_history.append({
-                "role": "user",
-                "content": user_message
+        conversation_history = await self.conversations.get_or_create(conversation_id)
+        self.logger.debug("💬 USER INPUT [%s]: %s", request_id, user_message)
+        self.logger.info("🧠 Processing chat message for conversation %s with %d previous messages", conversation_id, len(conversation_history))
+
+        # Add user message to conversation history
+        await self.conversations.append(conversation_id, {
+            "role": "user",
+            "content": user_message
+        })
+
+        return conversation_id, request_id
+
+    def _prepare_tools(self, filter_tools=None, custom_api=None) -> tuple[List[Dict[str, Any]], Dict[str, Any], List[Dict[str, str]], str]:
+        """Return tool definitions, callable mapping, system messages and prompt prefix id for a chat request (cached, read-only)"""
+        # Canonical order so the same tool set always produces the same schema and prompt prefix
+        filter_tools = sorted(set(filter_tools)) if filter_tools is not None else None
+        key = (
+            tuple(filter_tools) if filter_tools is not None else None,
+            custom_api.model_dump_json() if custom_api else None
+        )
+
+        prepared = self._tools_cache.get(key)
+        if prepared is not None:
+            self._tools_cache.move_to_end(key)
+            return prepared
+
+        prepared = self._build_tools(filter_tools, custom_api)
+        self._tools_cache[key] = prepared
+        while len(self._tools_cache) > TOOLS_CACHE_SIZE:
+            self._tools_cache.popitem(last=False)
+        return prepared
+
+    def _build_tools(self, filter_tools=None, custom_api=None) -> tuple[List[Dict[str, Any]], Dict[str, Any], List[Dict[str, str]], str]:
+        """Build tool definitions, callable mapping, system messages and prompt prefix id"""
+        # Setup custom tool if provided
+        custom_tool_instance = None
+        custom_tool_functions = {}
+
+        if custom_api:
+            self.logger.info("🔧 Creating custom API tool: %s -> %s", custom_api.name, custom_api.endpoint)
+            custom_tool_instance = CustomAPITool(custom_api.name, custom_api.endpoint, custom_api.description, custom_api.parameters)
+            custom_tool_functions = custom_tool_instance.get_function_mapping()
+            self.logger.debug("🛠️ Custom tool functions: %s", list(custom_tool_functions.keys()))
+            if custom_api.parameters and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("🔧 Custom tool parameters: %s", [p.name if hasattr(p, 'name') else p.get('name') for p in custom_api.parameters])
+
+        # Get filtered tools and add custom tool if available
+        tool_definitions = self.get_tool_definitions(filter_tools)
+        if custom_tool_instance:
+            custom_schema = custom_tool_instance.get_openai_function_schema()
+            tool_definitions.append(custom_schema)
+
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("🛠️ Enabled tools: %s", [tool.get('function', {}).get('name', '') for tool in tool_definitions])
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("🛠️ Tool definitions: %s", orjson.dumps(tool_definitions, option=orjson.OPT_INDENT_2).decode())
+
+        available_functions = self.get_available_functions()
+        if custom_tool_functions:
+            available_functions.update(custom_tool_functions)
+
+        # Check which tools are enabled
+        enabled_tools = {tool.get('function', {}).get('name', '') for tool in tool_definitions}
+
+        # The static system prompt always comes first; availability notes follow in their own message
+        system_messages = [SYSTEM_MESSAGE]
+        status_lines = [f"- {capability} (Currently Disabled)" for name, capability in TOOL_CAPABILITIES.items() if name not in enabled_tools]
+        if custom_tool_instance:
+            status_lines.append(f"- {custom_api.description}")
+        if status_lines:
+            system_messages.append({
+                "role": "system",
+                "content": "Tool availability for this conversation:\n" + "\n".join(status_lines)
             })
 
-            # Setup custom tool if provided
-            custom_tool_instance = None
-            custom_tool_functions = {}
+        # The static prompt is the same on every request, only worth logging when debugging
+        self.logger.debug("System messages: %s", system_messages)
+
+        prefix_id = self._get_prefix_id(tool_definitions)
+
+        return tool_definitions, available_functions, system_messages, prefix_id
+
+    def _get_prefix_id(self, tool_definitions: List[Dict[str, Any]]) -> str:
+        """Return a stable id for the (model, system prompt, tool set) prompt prefix"""
+        tool_set_hash = hashlib.sha256(orjson.dumps(tool_definitions, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        key = (self.model, SYSTEM_PROMPT_HASH, tool_set_hash)
+        prefix_id = self._prefix_ids.get(key)
+        if prefix_id is None:
+            prefix_id = hashlib.sha256("|".join(key).encode()).hexdigest()[:16]
+            self._prefix_ids[key] = prefix_id
+        return prefix_id
+
+    def _completion_kwargs(self, messages: List[Dict[str, Any]], tool_definitions: List[Dict[str, Any]], prefix_id: str,
+                           model: Optional[str] = None) -> Dict[str, Any]:
+        """Build the chat completion request arguments"""
+        kwargs = {
+            "model": model or self.model,
+            "messages": messages,
+            "tools": tool_definitions,
+            # in case we want to force the tool choice, default is "auto"
+            "tool_choice": "auto",
+            # Bounds a stuck call, timeouts are retried by the dispatcher
+            "timeout": self.request_timeout,
+        }
+        if tool_definitions:
+            # Independent lookups (e.g. weather and city info) come back in one turn and run concurrently
+            kwargs["parallel_tool_calls"] = True
+        # Route requests sharing a prefix to the same OpenAI prompt cache; other providers may reject the field
+        if self._use_prompt_cache_key:
+            kwargs["prompt_cache_key"] = prefix_id
+        return kwargs
+
+    def _log_usage(self, response, turn: int):
+        """Log prompt token usage, including provider-side cached prefix tokens"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+        self.logger.debug("📊 Turn %s usage: prompt_tokens=%s, cached_tokens=%s", turn, usage.prompt_tokens, cached_tokens)
+
+    @staticmethod
+    def _evict(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Build a compacted prompt view of the conversation history.
+
+        The stored history is never modified. Only the last MAX_PROMPT_TURNS user turns
+        are sent, cut at a user message so tool call / result pairs stay together.
+        Messages inside the last VERBATIM_TURNS user turns are sent as-is; older
+        messages are trimmed:
+        - repeated tool errors collapse to a single line
+        - only the most recent large result per tool name is kept
+        - past ARCHIVE_AFTER_MESSAGES, assistant and tool bodies are archived
+        Message structure (roles, tool_call ids) is preserved so tool pairings stay valid.
+        """
+        user_indexes = [i for i, msg in enumerate(history) if msg.get("role") == "user"]
+        if len(user_indexes) > MAX_PROMPT_TURNS:
+            prompt_start = user_indexes[-MAX_PROMPT_TURNS]
+            history = history[prompt_start:]
+            user_indexes = [i - prompt_start for i in user_indexes[-MAX_PROMPT_TURNS:]]
+        if len(user_indexes) <= VERBATIM_TURNS:
+            return history
+        window_start = user_indexes[-VERBATIM_TURNS]
+
+        # Map tool_call ids to function names to group tool results by tool
+        tool_names = {}
+        for msg in history:
+            for tool_call in msg.get("tool_calls") or ():
+                tool_names[tool_call["id"]] = tool_call["function"]["name"]
+
+        archive = len(history) > ARCHIVE_AFTER_MESSAGES
+        latest_large_result = {}
+        for i in range(window_start - 1, -1, -1):
+            msg = history[i]
+            if msg.get("role") == "tool" and len(msg.get("content") or "") > LARGE_TOOL_RESULT_CHARS:
+                latest_large_result.setdefault(tool_names.get(msg.get("tool_call_id")), i)
+
+        compacted = []
+        seen_errors = set()
+        for i, msg in enumerate(history[:window_start]):
+            role = msg.get("role")
+            content = msg.get("content") or ""
+
+            if role == "tool":
+                if content.startswith("Error executing"):
+                    first_line = content.splitlines()[0]
+                    content = "[repeated tool error]" if first_line in seen_errors else first_line
+                    seen_errors.add(first_line)
+                elif len(content) > LARGE_TOOL_RESULT_CHARS and latest_large_result.get(tool_names.get(msg.get("tool_call_id"))) != i:
+                    content = f"[superseded {tool_names.get(msg.get('tool_call_id'), 'tool')} result]"
+                if archive:
+                    content = ARCHIVED_CONTENT
+            elif role == "assistant" and archive:
+                content = ARCHIVED_CONTENT
+
+            compacted.append(msg if content == (msg.get("content") or "") else {**msg, "content": content})
+
+        compacted.extend(history[window_start:])
+        return compacted
+
+    async def _adecide_tools(self, messages: List[Dict[str, Any]], tool_definitions: List[Dict[str, Any]], prefix_id: str, turn: int):
+        """
+        Let the tool model decide on tool calls, returning its message if it requested any.
+        None means the user-facing answer should come from the main model.
+        """
+        if not self.tool_model or not tool_definitions:
+            return None
+        self.logger.info("🤖 Calling tool model (%s) - Turn %s with %d tools", self.tool_model, turn, len(tool_definitions))
+        response = await self.dispatcher.submit(
+            **self._completion_kwargs(messages, tool_definitions, prefix_id, model=self.tool_model)
+        )
+        self._log_usage(response, turn)
+        message = response.choices[0].message
+        return message if message.tool_calls else None
+
+    async def _summarize(self, summary: str, dropped: List[Dict[str, Any]]) -> str:
+        """Fold dropped messages into the running summary with a single cheap completion"""
+        lines = [f"Earlier summary: {summary}"] if summary else []
+        lines.extend(
+            f"{msg['role']}: {msg['content']}"
+            for msg in dropped
+            if msg.get("role") in ("user", "assistant") and msg.get("content")
+        )
+        response = await self.dispatcher.submit(
+            model=self.summary_model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": "\n".join(lines)}
+            ]
+        )
+        return response.choices[0].message.content or summary
+
+    async def _aprompt_messages(self, conversation_id: str, system_messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """System messages, running summary of the turns beyond the prompt window and the compacted history"""
+        history = await self.conversations.get_or_create(conversation_id)
+        if not self._summaries_enabled:
+            return system_messages + self._evict(history)
+
+        user_indexes = [i for i, msg in enumerate(history) if msg.get("role") == "user"]
+        # Summaries live in the conversation store and are dropped with the conversation,
+        # one covering more than the current history belongs to an earlier conversation
+        stored = await self.conversations.get_summary(conversation_id)
+        covered, summary = stored if stored and stored[0] <= len(history) else (0, "")
+        if len(user_indexes) > MAX_PROMPT_TURNS:
+            window_start = user_indexes[-MAX_PROMPT_TURNS]
+            # Summaries end on a user message, so tool call / result pairs are never split
+            pending_turns = sum(1 for i in user_indexes if covered <= i < window_start)
+            if pending_turns >= SUMMARY_BATCH_TURNS:
+                try:
+                    summary = await self._summarize(summary, history[covered:window_start])
+                    covered = window_start
+                    self.logger.info("📝 Summarized %d turns of conversation %s", pending_turns, conversation_id)
+                except Exception as e:
+                    self.logger.warning("⚠️ History summary failed, continuing without it: %s", e)
+
+        if not summary:
+            return system_messages + self._evict(history)
+
+        if (covered, summary) != stored:
+            await self.conversations.set_summary(conversation_id, covered, summary)
+
+        summary_message = {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+        return system_messages + [summary_message] + self._evict(history)
+
+    def _repeats_tool_calls(self, message, seen_signatures: set, turn: int) -> bool:
+        """Detect the model requesting the same tool calls with the same arguments as in an earlier turn"""
+        signature = frozenset((tool_call.function.name, tool_call.function.arguments) for tool_call in message.tool_calls)
+        if signature in seen_signatures:
+            self.logger.warning("🔁 Turn %s: AI repeated tool calls %s, stopping", turn, ', '.join(sorted(name for name, _ in signature)))
+            return True
+        seen_signatures.add(signature)
+        return False
+
+    @staticmethod
+    def _serialize_tool_calls(tool_calls) -> List[Dict[str, Any]]:
+        """Convert SDK tool call objects into conversation history dicts"""
+        return [
+            {"id": call_id, "type": call_type, "function": {"name": name, "arguments": arguments}}
+            for call_id, call_type, name, arguments in map(_tool_call_fields, tool_calls)
+        ]
+
+    async def _record_tool_calls(self, conversation_id: str, message, turn: int) -> Dict[str, Any]:
+        """Append the assistant message that requested tool calls to the conversation and return it"""
+        self.logger.info("🔧 Turn %s: AI requested %d tool calls %s", turn, len(message.tool_calls), ', '.join([tool_call.function.name for tool_call in message.tool_calls]))
+
+        assistant_message = {
+            "role": "assistant",
+            "content": message.content,
+            "tool_calls": self._serialize_tool_calls(message.tool_calls)
+        }
+        await self.conversations.append(conversation_id, assistant_message)
+        return assistant_message
+
+    def _execute_tool_call(self, tool_call, available_functions: Dict[str, Any], turn: int) -> Dict[str, Any]:
+        """Execute a single tool call and return the tool message for the conversation"""
+        function_name = tool_call.function.name
+        tool_call_id = tool_call.id
 
-            if custom_api:
-                self.logger.info(f"🔧 Creating custom API tool: {custom_api.name} -> {custom_api.endpoint}")
-                custom_tool_instance = CustomAPITool(custom_api.name, custom_api.endpoint, custom_api.description, custom_api.parameters)
-                custom_tool_functions = custom_tool_instance.get_function_mapping()
-                self.logger.debug(f"🛠️ Custom tool functions: {list(custom_tool_functions.keys())}")
-                if custom_api.parameters:
-                    self.logger.debug(f"🔧 Custom tool parameters: {[p.name if hasattr(p, 'name') else p.get('name') for p in custom_api.parameters]}")
+        self.logger.info("🔧 Turn %s: Executing tool call %s: %s", turn, tool_call_id, function_name)
+
+        try:
+            function_args = orjson.loads(tool_call.function.arguments)
+            log_tool_call(self.logger, "OpenAI", function_name, function_args)
+
+            function_to_call = available_functions[function_name]
+            function_response = function_to_call(**function_args)
+
+            content = str(function_response)
+            log_tool_result(self.logger, "OpenAI", function_name, True, len(content))
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("🔧 Tool %s response: %s...", tool_call_id, content[:200])
+
+            return {
+                "role": "tool",
+                "tool_call_id": tool_call_id,
+                "content": content
+            }
+
+        except Exception as e:
+            self.logger.error("❌ Tool call %s failed: %s", tool_call_id, e)
+            log_tool_result(self.logger, "OpenAI", function_name, False, 0)
+            return {
+                "role": "tool",
+                "tool_call_id": tool_call_id,
+                "content": f"Error executing {function_name}: {str(e)}"
+            }
+
+    @staticmethod
+    def _tool_call_key(tool_call) -> tuple:
+        """Identify a tool call by function name and canonical arguments"""
+        try:
+            arguments = orjson.dumps(orjson.loads(tool_call.function.arguments), option=orjson.OPT_SORT_KEYS)
+        except orjson.JSONDecodeError:
+            arguments = tool_call.function.arguments
+        return tool_call.function.name, arguments
+
+    async def _aexecute_tool_calls(self, tool_calls, available_functions: Dict[str, Any], turn: int,
+                                   started_tools: Optional[Dict[tuple, asyncio.Future]] = None) -> List[Dict[str, Any]]:
+        """
+        Run the tool calls of one assistant turn concurrently, returning tool messages in call order.
+        Identical calls (same function and arguments) run once and share the result.
+        """
+        # Tools are blocking (requests / SQLAlchemy), run them off the event loop in the dedicated
+        # tool pool so slow tools queue there instead of starving the default executor
+        futures = dict(started_tools or {})
+        keys = []
+        for tool_call in tool_calls:
+            key = self._tool_call_key(tool_call)
+            if key not in futures:
+                futures[key] = self._start_tool_call(tool_call, available_functions, turn)
+            keys.append(key)
+
+        results = dict(zip(futures, await asyncio.gather(*futures.values())))
+        return [{**results[key], "tool_call_id": tool_call.id} for key, tool_call in zip(keys, tool_calls)]
+
+    def _start_tool_call(self, tool_call, available_functions: Dict[str, Any], turn: int) -> asyncio.Future:
+        """Schedule a tool call in the tool pool, the future resolves to its tool message"""
+        return asyncio.get_running_loop().run_in_executor(
+            self.tool_executor, self._execute_tool_call, tool_call, available_functions, turn
+        )
+
+    async def _record_final_message(self, conversation_id: str, message, turn: int) -> str:
+        """Append the final assistant response (no tool calls) to the conversation"""
+        final_message = message.content or ''
+        self.logger.info("💬 Turn %s: Final response received (no tool calls)", turn)
+
+        await self.conversations.append(conversation_id, {
+            "role": "assistant",
+            "content": final_message
+        })
+
+        return final_message
+
+    def _finish_chat(self, final_message: str, conversation_id: str, request_id: str, turn: int, max_turns: int) -> tuple[str, str]:
+        """Log completion and return the final response"""
+        # Check if we hit max turns
+        if turn >= max_turns:
+            self.logger.warning("⚠️ Reached maximum turns (%s), stopping conversation", max_turns)
+            if not final_message:
+                final_message = MAX_TURNS_RESPONSE
+
+        self.logger.debug("🤖 AI RESPONSE [%s]: %s", request_id, final_message)
+        self.logger.info("✅ Chat completed successfully after %s turns, response length: %d", turn, len(final_message or ''))
+        log_request_end(self.logger, request_id, 200, {"response_length": len(final_message or ''), "turns": turn, "conversation_id": conversation_id})
+
+        return final_message, conversation_id
+
+    async def _fail_chat(self, error: Exception, user_message: str, conversation_id: str, request_id: str) -> tuple[str, str]:
+        """Log a failed chat and return a user-facing error response"""
+        log_error_with_context(self.logger, error, "chat_processing", {
+            "user_message": user_message[:100],
+            "conversation_id": conversation_id,
+            "conversation_length": len(await self.conversations.get(conversation_id, []))
+        })
+        log_request_end(self.logger, request_id, 500)
+        self.logger.warning("🚨 Error while processing chat: %s", error)
+        return INTERNAL_ERROR_RESPONSE, conversation_id
+
+    async def achat(self, user_message: str, conversation_id: Optional[str] = None, filter_tools=None, custom_api=None) -> tuple[str, str]:
+        """Process user message and return AI response with multi-turn tool calling"""
+        conversation_id, request_id = await self._begin_chat(user_message, conversation_id)
+
+        try:
+            tool_definitions, available_functions, system_messages, prefix_id = self._prepare_tools(filter_tools, custom_api)
 
             # Multi-turn loop for tool calling
             max_turns = 10  # Prevent infinite loops
             turn = 0
             final_message = ""
 
-            # Call OpenAI with tool calling - get filtered tools and add custom tool if available
-            tool_definitions = self.get_tool_definitions(filter_tools)
-            # Add custom tool if available
-            if custom_tool_instance:
-                custom_schema = custom_tool_instance.get_openai_function_schema()
-                tool_definitions.append(custom_schema)
+            # Built once, later turns only append the tool call round trip
+            messages = await self._aprompt_messages(conversation_id, system_messages)
+            seen_signatures = set()
 
-            self.logger.info(f"🛠️ Enabled tools: {[tool.get('function', {}).get('name', '') for tool in tool_definitions]}")
+            while turn < max_turns:
+                turn += 1
+                self.logger.info("🔄 Turn %s/%s", turn, max_turns)
+                self.logger.debug("📤 Sending %d messages to OpenAI", len(messages))
+
+                message = await self._adecide_tools(messages, tool_definitions, prefix_id, turn)
+                if message is None:
+                    self.logger.info("🤖 Calling OpenAI API (%s) - Turn %s with %d tools", self.model, turn, len(tool_definitions))
+                    response = await self.dispatcher.submit(
+                        **self._completion_kwargs(messages, tool_definitions, prefix_id)
+                    )
+                    self._log_usage(response, turn)
+                    message = response.choices[0].message
+
+                self.logger.debug("📥 OpenAI response turn %s: tool_calls=%s, content_length=%d", turn, bool(message.tool_calls), len(message.content or ''))
+
+                if message.tool_calls and self._repeats_tool_calls(message, seen_signatures, turn):
+                    # The results would be the same as last time, answer with what we have
+                    stopped = SimpleNamespace(content=message.content or MAX_TURNS_RESPONSE)
+                    final_message = await self._record_final_message(conversation_id, stopped, turn)
+                    break
 
-            self.logger.debug(f"🛠️ Tool definitions: {json.dumps(tool_definitions, indent=2)}")
+                if message.tool_calls:
+                    messages.append(await self._record_tool_calls(conversation_id, message, turn))
 
-            # Check which tools are enabled
-            enabled_tools = [tool.get('function', {}).get('name', '') for tool in tool_definitions]
+                    tool_messages = await self._aexecute_tool_calls(message.tool_calls, available_functions, turn)
+                    await self.conversations.extend(conversation_id, tool_messages)
+                    messages.extend(tool_messages)
 
-            city_status = "" if "get_city_info" in enabled_tools else " (Currently Disabled)"
-            weather_status = "" if "get_weather" in enabled_tools else " (Currently Disabled)"
-            research_status = "" if "search_research" in enabled_tools else " (Currently Disabled)"
-            product_status = "" if "find_products" in enabled_tools else " (Currently Disabled)"
+                    continue
 
-            # Add custom tool status if available
-            custom_tool_line = ""
-            if custom_tool_instance:
-                custom_tool_line = f"\n                - {custom_api.description}"
+                final_message = await self._record_final_message(conversation_id, message, turn)
+                break
 
-            # Create system message
-            system_message = {
-                "role": "system",
-                "content": f"""
-You are a helpful chatbot that can assist users with:
-    - Information about cities (using Wikipedia){city_status}
-    - Weather information for cities{weather_status}
-    - Research topics and academic information{research_status}
-    - Product searches from our database{product_status}
-    {custom_tool_line}
+            return self._finish_chat(final_message, conversation_id, request_id, turn, max_turns)
 
-Always greet users warmly and be helpful. Use the available functions when appropriate to provide accurate information.
-If you don't have the information, inform the user that you don't have the information and try to suggest other ways to get the information.
-If the function returns an error, inform the user about the nature of the error, e.g. rate limit, timeout, internal server error, etc.
-While using get_city_info function, add the url of the wikipedia page to response.
-If the tool you need to use is not enabled, inform the user that the tool is not enabled and suggest to activate it in the tool selection section.
-"""
-            }
+        except Exception as e:
+            return await self._fail_chat(e, user_message, conversation_id, request_id)
+
+    @staticmethod
+    def _buffered_tool_call(buffer: Dict[str, str]) -> SimpleNamespace:
+        """Build a tool call object shaped like the SDK's from a streamed buffer"""
+        return SimpleNamespace(id=buffer["id"], type="function",
+                               function=SimpleNamespace(name=buffer["name"], arguments=buffer["arguments"]))
+
+    @staticmethod
+    def _merge_tool_call_deltas(buffers: Dict[int, Dict[str, str]], tool_call_deltas):
+        """Accumulate streamed tool call fragments by index"""
+        for delta in tool_call_deltas:
+            buffer = buffers.setdefault(delta.index, {"id": "", "name": "", "arguments": ""})
+            if delta.id:
+                buffer["id"] = delta.id
+            if delta.function:
+                buffer["name"] += delta.function.name or ""
+                buffer["arguments"] += delta.function.arguments or ""
+
+    async def astream(self, user_message: str, conversation_id: str, filter_tools=None, custom_api=None) -> AsyncIterator[str]:
+        """Stream the AI response as text deltas, running tool calls between turns"""
+        conversation_id, request_id = await self._begin_chat(user_message, conversation_id)
+
+        try:
+            tool_definitions, available_functions, system_messages, prefix_id = self._prepare_tools(filter_tools, custom_api)
+
+            # Multi-turn loop for tool calling
+            max_turns = 10  # Prevent infinite loops
+            turn = 0
+            final_message = ""
 
-            self.logger.info(f"System message: {json.dumps(system_message, indent=2)}")
+            # Built once, later turns only append the tool call round trip
+            messages = await self._aprompt_messages(conversation_id, system_messages)
+            seen_signatures = set()
 
             while turn < max_turns:
                 turn += 1
-                self.logger.info(f"🔄 Turn {turn}/{max_turns}")
-
-                # Prepare messages for OpenAI
-                messages = [system_message] + conversation_history
-                self.logger.debug(f"📤 Sending {len(messages)} messages to OpenAI")
-
-                self.logger.info(f"🤖 Calling OpenAI API ({self.model}) - Turn {turn} with {len(tool_definitions)} tools")
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    tools=tool_definitions,
-                    # in case we want to force the tool choice, default is "auto"
-                    tool_choice="auto",
-                    # parallel_tool_calls=False
-                )
-
-                message = response.choices[0].message
-                self.logger.debug(f"📥 OpenAI response turn {turn}: tool_calls={bool(message.tool_calls)}, content_length={len(message.content or '')}")
-
-                # Check if AI wants to call functions (new tool_calls format)
+                self.logger.info("🔄 Turn %s/%s (streaming)", turn, max_turns)
+                # Tool decisions from the tool model are not streamed, only the user-facing answer is
+                message = await self._adecide_tools(messages, tool_definitions, prefix_id, turn)
+                # Tool calls stream one after another, each is started as soon as the next one begins
+                started_tools: Dict[tuple, asyncio.Future] = {}
+                streamed = False
+                if message is None:
+                    self.logger.info("🤖 Calling OpenAI API (%s) - Turn %s with %d tools", self.model, turn, len(tool_definitions))
+                    stream = await self.dispatcher.submit(
+                        **self._completion_kwargs(messages, tool_definitions, prefix_id),
+                        stream=True
+                    )
+
+                    content_parts = []
+                    tool_call_buffers: Dict[int, Dict[str, str]] = {}
+                    seen_calls = set().union(*seen_signatures)
+                    complete_indexes = set()
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            content_parts.append(delta.content)
+                            streamed = True
+                            yield delta.content
+                        if delta.tool_calls:
+                            self._merge_tool_call_deltas(tool_call_buffers, delta.tool_calls)
+                            for index in sorted(tool_call_buffers)[:-1]:
+                                if index in complete_indexes:
+                                    continue
+                                complete_indexes.add(index)
+                                buffer = tool_call_buffers[index]
+                                tool_call = self._buffered_tool_call(buffer)
+                                key = self._tool_call_key(tool_call)
+                                # Calls repeated from an earlier turn are left to the loop detection below
+                                if key not in started_tools and (buffer["name"], buffer["arguments"]) not in seen_calls:
+                                    started_tools[key] = self._start_tool_call(tool_call, available_functions, turn)
+
+                    message = SimpleNamespace(
+                        content="".join(content_parts) or None,
+                        tool_calls=[self._buffered_tool_call(buffer) for _, buffer in sorted(tool_call_buffers.items())]
+                    )
+
+                if message.tool_calls and self._repeats_tool_calls(message, seen_signatures, turn):
+                    # The results would be the same as last time, answer with what we have
+                    stopped = SimpleNamespace(content=message.content or MAX_TURNS_RESPONSE)
+                    final_message = await self._record_final_message(conversation_id, stopped, turn)
+                    if not streamed:
+                        yield final_message
+                    break
+
                 if message.tool_calls:
-                    self.logger.info(f"🔧 Turn {turn}: AI requested {len(message.tool_calls)} tool calls {', '.join([tool_call.function.name for tool_call in message.tool_calls])}")
-
-                    # Add the assistant message with tool calls to conversation
-                    conversation_history.append({
-                        "role": "assistant",
-                        "content": message.content,
-                        "tool_calls": [
-                            {
-                                "id": tool_call.id,
-                                "type": tool_call.type,
-                                "function": {
-                                    "name": tool_call.function.name,
-                                    "arguments": tool_call.function.arguments
-                                }
-                            }
-                            for tool_call in message.tool_calls
-                        ]
-                    })
-
-                    # Execute each tool call
-                    available_functions = self.get_available_functions()
-
-                    # Add custom tool functions if available
-                    if custom_tool_functions:
-                        available_functions.update(custom_tool_functions)
-
-                    for tool_call in message.tool_calls:
-                        function_name = tool_call.function.name
-                        function_args = json.loads(tool_call.function.arguments)
-                        tool_call_id = tool_call.id
-
-                        self.logger.info(f"🔧 Turn {turn}: Executing tool call {tool_call_id}: {function_name}")
-                        log_tool_call(self.logger, "OpenAI", function_name, function_args)
-
-                        try:
-                            function_to_call = available_functions[function_name]
-                            function_response = function_to_call(**function_args)
-
-                            response_length = len(str(function_response))
-                            log_tool_result(self.logger, "OpenAI", function_name, True, response_length)
-                            self.logger.debug(f"🔧 Tool {tool_call_id} response: {str(function_response)[:200]}...")
-
-                            # Add tool response to conversation
-                            conversation_history.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "content": str(function_response)
-                            })
-
-                        except Exception as e:
-                            self.logger.error(f"❌ Tool call {tool_call_id} failed: {str(e)}")
-                            log_tool_result(self.logger, "OpenAI", function_name, False, 0)
-                            # Add error response to conversation
-                            conversation_history.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "content": f"Error executing {function_name}: {str(e)}"
-                            })
-
-                    # Continue to next turn - don't break, let AI decide what to do with the tool results
-                    continue
+                    messages.append(await self._record_tool_calls(conversation_id, message, turn))
 
-                else:
-                    # No tool calls - we have the final response
-                    final_message = message.content or ''
-                    self.logger.info(f"💬 Turn {turn}: Final response received (no tool calls)")
+                    tool_messages = await self._aexecute_tool_calls(message.tool_calls, available_functions, turn, started_tools)
+                    await self.conversations.extend(conversation_id, tool_messages)
+                    messages.extend(tool_messages)
 
-                    # Add final AI response to conversation history
-                    conversation_history.append({
-                        "role": "assistant",
-                        "content": final_message
-                    })
+                    continue
 
-                    break
+                final_message = await self._record_final_message(conversation_id, message, turn)
+                break
 
-            # Check if we hit max turns
-            if turn >= max_turns:
-                self.logger.warning(f"⚠️ Reached maximum turns ({max_turns}), stopping conversation")
-                if not final_message:
-                    final_message = "I apologize, but I reached the maximum number of processing steps. Please try rephrasing your request."
+            if not final_message and turn >= max_turns:
+                yield MAX_TURNS_RESPONSE
+            self._finish_chat(final_message, conversation_id, request_id, turn, max_turns)
 
-            self.logger.debug(f"🤖 AI RESPONSE [{request_id}]: {final_message}")
-            self.logger.info(f"✅ Chat completed successfully after {turn} turns, response length: {len(final_message or '')}")
-            log_request_end(self.logger, request_id, 200, {"response_length": len(final_message or ''), "turns": turn, "conversation_id": conversation_id})
+        except Exception as e:
+            response, _ = await self._fail_chat(e, user_message, conversation_id, request_id)
+            yield response
 
-            return final_message, conversation_id
+    async def record_exchange(self, user_message: str, response: str, conversation_id: Optional[str] = None) -> str:
+        """Append a user message and an assistant response produced without calling OpenAI"""
+        if conversation_id is None:
+            conversation_id = str(uuid.uuid4())
 
-        except Exception as e:
-            log_error_with_context(self.logger, e, "chat_processing", {
-                "user_message": user_message[:100],
-                "conversation_id": conversation_id,
-                "conversation_length": len(self.conversations.get(conversation_id, []))
-            })
-            log_request_end(self.logger, request_id, 500)
-            error_response = f"Sorry, I encountered an internal error. Please try again later."
-            self.logger.warning(f"🚨 Error while processing chat: {str(e)}")
-            return error_response, conversation_id
+        await self.conversations.extend(conversation_id, [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": response}
+        ])
+
+        return conversation_id
 
-    def clear_conversation(self, conversation_id: Optional[str] = None):
+    async def clear_conversation(self, conversation_id: Optional[str] = None):
         """Clear conversation history"""
         if conversation_id is None:
             # Clear all conversations
-            total_messages = sum(len(conv) for conv in self.conversations.values())
-            total_conversations = len(self.conversations)
-            self.conversations = {}
-            self.logger.info(f"🧹 All conversation history cleared ({total_conversations} conversations, {total_messages} messages)")
+            total_messages = await self.conversations.total_messages()
+            total_conversations = await self.conversations.count()
+            await self.conversations.clear()
+            self.logger.info("🧹 All conversation history cleared (%s conversations, %s messages)", total_conversations, total_messages)
         else:
             # Clear specific conversation
-            if conversation_id in self.conversations:
-                previous_length = len(self.conversations[conversation_id])
-                del self.conversations[conversation_id]
-                self.logger.info(f"🧹 Conversation {conversation_id} cleared (was {previous_length} messages)")
+            history = await self.conversations.pop(conversation_id)
+            if history is not None:
+                previous_length = len(history)
+                self.logger.info("🧹 Conversation %s cleared (was %s messages)", conversation_id, previous_length)
             else:
-                self.logger.warning(f"⚠️ Attempted to clear non-existent conversation: {conversation_id}")
+                self.logger.warning("⚠️ Attempted to clear non-existent conversation: %s", conversation_id)
 
-    def get_conversation_history(self, conversation_id: str) -> List[Dict[str, Any]]:
+    async def get_conversation_history(self, conversation_id: str) -> List[Dict[str, Any]]:
         """Get conversation history for a specific conversation_id"""
-        return self.conversations.get(conversation_id, [])
+        return await self.conversations.get(conversation_id, [])
 
-    def get_conversation_count(self) -> int:
+    async def get_all_conversations(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get a snapshot of all conversations keyed by conversation_id"""
+        return await self.conversations.to_dict()
+
+    async def get_conversation_count(self) -> int:
         """Get total number of active conversations"""
-        return len(self.conversations)
+        return await self.conversations.count()
 
-    def get_total_message_count(self) -> int:
+    async def get_total_message_count(self) -> int:
         """Get total number of messages across all conversations"""
-        return sum(len(conv) for conv in self.conversations.values())
+        return await self.conversations.total_messages()
 
-    def list_conversation_ids(self) -> List[str]:
+    async def list_conversation_ids(self) -> List[str]:
         """Get list of all conversation IDs"""
-        return list(self.conversations.keys())
+        return await self.conversations.ids()
 
-    def cleanup_empty_conversations(self) -> int:
+    async def cleanup_empty_conversations(self) -> int:
         """Remove conversations with no messages and return count of removed conversations"""
-        empty_conversations = [conv_id for conv_id, history in self.conversations.items() if len(history) == 0]
+        empty_conversations = [conv_id for conv_id, history in await self.conversations.items() if len(history) == 0]
         for conv_id in empty_conversations:
-            del self.conversations[conv_id]
+            await self.conversations.pop(conv_id)
 
         if empty_conversations:
-            self.logger.info(f"🧹 Cleaned up {len(empty_conversations)} empty conversations")
+            self.logger.info("🧹 Cleaned up %d empty conversations", len(empty_conversations))
 
         return len(empty_conversations)
 
+
+# Shared service instance used by both the API routes and the Gradio UI
+openai_service = OpenAIService()
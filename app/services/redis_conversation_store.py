@@ -0,0 +1,246 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+import orjson
+import redis.asyncio as redis
+from app.core.logging_config import get_logger
+
+
+class RedisConversationStore:
+    """
+    Conversation store shared by all workers through Redis.
+
+    Exposes the same async interface as ConversationStore, every Redis round trip
+    is awaited so the event loop keeps serving other chats. Layout, under a key prefix:
+
+    - {prefix}:{id}      list of orjson encoded messages
+    - {prefix}:summary:{id}  running summary of the turns beyond the prompt window
+    - {prefix}:index     sorted set of conversation ids scored by last access time
+    - {prefix}:total     running message count across all conversations
+
+    Idle conversations (TTL) and the least recently used ones beyond
+    max_conversations are removed by whichever worker prunes first; message lists
+    also carry a Redis expiry of twice the TTL as a safety net for conversations
+    abandoned while no worker is running. Recently
+    read histories are kept in a small in-process L1 cache so hot conversations
+    only fetch the messages appended by other workers since the last read.
+    """
+
+    PRUNE_INTERVAL_SECONDS = 5
+
+    def __init__(self, url: str, max_conversations: int = 10_000, ttl_seconds: int = 3600,
+                 key_prefix: str = "conv", l1_max_entries: int = 1024, l1_ttl_seconds: float = 60,
+                 max_connections: int = 64):
+        # Waits for a free connection instead of failing when all max_connections are in use
+        self.redis = redis.Redis(connection_pool=redis.BlockingConnectionPool.from_url(url, max_connections=max_connections))
+        self.max_conversations = max_conversations
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.index_key = f"{key_prefix}:index"
+        self.total_key = f"{key_prefix}:total"
+        self.l1_max_entries = l1_max_entries
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self.logger = get_logger('app.services.redis_conversation_store')
+
+        self._l1: OrderedDict[str, Tuple[float, List[Dict[str, Any]]]] = OrderedDict()
+        self._next_prune = 0.0
+
+    def _key(self, conversation_id: str) -> str:
+        return f"{self.key_prefix}:{conversation_id}"
+
+    def _summary_key(self, conversation_id: str) -> str:
+        return f"{self.key_prefix}:summary:{conversation_id}"
+
+    @staticmethod
+    def _encode(message: Dict[str, Any]) -> bytes:
+        return orjson.dumps(message)
+
+    @staticmethod
+    def _decode(data: bytes) -> Dict[str, Any]:
+        return orjson.loads(data)
+
+    def _l1_get(self, conversation_id: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._l1.get(conversation_id)
+        if entry is None:
+            return None
+        stored_at, history = entry
+        if time.monotonic() - stored_at >= self.l1_ttl_seconds:
+            del self._l1[conversation_id]
+            return None
+        self._l1.move_to_end(conversation_id)
+        return history
+
+    def _l1_put(self, conversation_id: str, history: List[Dict[str, Any]]):
+        self._l1[conversation_id] = (time.monotonic(), history)
+        self._l1.move_to_end(conversation_id)
+        while len(self._l1) > self.l1_max_entries:
+            self._l1.popitem(last=False)
+
+    async def _delete(self, conversation_ids: List[str]):
+        """Delete conversations and keep the message counter in sync, safe against concurrent workers"""
+        removed_messages = 0
+        for conversation_id in conversation_ids:
+            self._l1.pop(conversation_id, None)
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.llen(self._key(conversation_id))
+            pipe.delete(self._key(conversation_id))
+            pipe.delete(self._summary_key(conversation_id))
+            pipe.zrem(self.index_key, conversation_id)
+            length, deleted, _, _ = await pipe.execute()
+            # Only the worker that actually deleted the list decrements the counter
+            if deleted:
+                removed_messages += length
+        if removed_messages:
+            await self.redis.decrby(self.total_key, removed_messages)
+
+    async def _prune(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now < self._next_prune:
+            return
+        self._next_prune = now + self.PRUNE_INTERVAL_SECONDS
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrangebyscore(self.index_key, "-inf", time.time() - self.ttl_seconds)
+        pipe.zcard(self.index_key)
+        expired, total = await pipe.execute()
+        overflow = total - len(expired) - self.max_conversations
+        if overflow > 0:
+            expired += await self.redis.zrange(self.index_key, len(expired), len(expired) + overflow - 1)
+        if expired:
+            await self._delete([conversation_id.decode() for conversation_id in expired])
+
+    async def contains(self, conversation_id: str) -> bool:
+        """Return whether the conversation exists and has not expired"""
+        score = await self.redis.zscore(self.index_key, conversation_id)
+        return score is not None and time.time() - score < self.ttl_seconds
+
+    async def count(self) -> int:
+        """Return the number of conversations"""
+        await self._prune()
+        return await self.redis.zcard(self.index_key)
+
+    async def get(self, conversation_id: str, default=None) -> Optional[List[Dict[str, Any]]]:
+        """Return the conversation history and mark it as recently used"""
+        await self._prune()
+        key = self._key(conversation_id)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zscore(self.index_key, conversation_id)
+        pipe.llen(key)
+        pipe.zadd(self.index_key, {conversation_id: time.time()}, xx=True)
+        score, length, _ = await pipe.execute()
+
+        if score is None or time.time() - score >= self.ttl_seconds:
+            if score is not None:
+                await self._delete([conversation_id])
+            self._l1.pop(conversation_id, None)
+            return default
+
+        # Lists are append-only, so a cached history only needs the messages other workers added since
+        history = self._l1_get(conversation_id)
+        if history is None or len(history) > length:
+            history = [self._decode(data) for data in await self.redis.lrange(key, 0, -1)]
+        elif len(history) < length:
+            history.extend(self._decode(data) for data in await self.redis.lrange(key, len(history), -1))
+        self._l1_put(conversation_id, history)
+        return history
+
+    async def get_or_create(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Return the conversation history, creating an empty one if needed"""
+        history = await self.get(conversation_id)
+        if history is not None:
+            return history
+
+        await self.redis.zadd(self.index_key, {conversation_id: time.time()})
+        await self._prune(force=True)
+        history: List[Dict[str, Any]] = []
+        self._l1_put(conversation_id, history)
+        return history
+
+    async def append(self, conversation_id: str, message: Dict[str, Any]):
+        """Append a message to a conversation"""
+        history = await self.get_or_create(conversation_id)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(self._key(conversation_id), self._encode(message))
+        pipe.expire(self._key(conversation_id), self.ttl_seconds * 2)
+        pipe.zadd(self.index_key, {conversation_id: time.time()})
+        pipe.incr(self.total_key)
+        await pipe.execute()
+
+        history.append(message)
+
+    async def extend(self, conversation_id: str, messages: List[Dict[str, Any]]):
+        """Append several messages to a conversation in a single round trip"""
+        if not messages:
+            return
+        history = await self.get_or_create(conversation_id)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(self._key(conversation_id), *(self._encode(message) for message in messages))
+        pipe.expire(self._key(conversation_id), self.ttl_seconds * 2)
+        pipe.zadd(self.index_key, {conversation_id: time.time()})
+        pipe.incrby(self.total_key, len(messages))
+        await pipe.execute()
+
+        history.extend(messages)
+
+    async def get_summary(self, conversation_id: str) -> Optional[Tuple[int, str]]:
+        """Return the running summary as (history index covered, summary), None if there is none"""
+        data = await self.redis.get(self._summary_key(conversation_id))
+        if data is None:
+            return None
+        covered, summary = self._decode(data)
+        return covered, summary
+
+    async def set_summary(self, conversation_id: str, covered: int, summary: str):
+        """Store the running summary, it expires with the message list"""
+        await self.redis.set(self._summary_key(conversation_id), orjson.dumps([covered, summary]), ex=self.ttl_seconds * 2)
+
+    async def pop(self, conversation_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Remove a conversation and return its history"""
+        history = await self.get(conversation_id)
+        if history is None:
+            return None
+        await self._delete([conversation_id])
+        return history
+
+    async def clear(self):
+        """Remove all conversations"""
+        conversation_ids = [conversation_id.decode() for conversation_id in await self.redis.zrange(self.index_key, 0, -1)]
+        await self._delete(conversation_ids)
+        self._l1.clear()
+
+    async def keys(self) -> List[str]:
+        """Return the conversation ids in access order"""
+        await self._prune()
+        return [conversation_id.decode() for conversation_id in await self.redis.zrange(self.index_key, 0, -1)]
+
+    async def ids(self) -> List[str]:
+        """Return the conversation ids"""
+        return await self.keys()
+
+    async def items(self) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Return a snapshot of (conversation id, history) pairs"""
+        return list((await self.to_dict()).items())
+
+    async def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return a plain dict snapshot of all conversations"""
+        conversation_ids = await self.keys()
+        pipe = self.redis.pipeline(transaction=False)
+        for conversation_id in conversation_ids:
+            pipe.lrange(self._key(conversation_id), 0, -1)
+        histories = await pipe.execute()
+        return {
+            conversation_id: [self._decode(data) for data in history]
+            for conversation_id, history in zip(conversation_ids, histories)
+        }
+
+    async def total_messages(self) -> int:
+        """Return the number of messages across all conversations"""
+        await self._prune()
+        return int(await self.redis.get(self.total_key) or 0)
+
+    async def aclose(self):
+        """Close the Redis connection pool"""
+        await self.redis.aclose()
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, List
+import numpy as np
+from app.core.logging_config import get_logger
+
+
+class ResponseCache:
+    """
+    Two-tier cache for chat responses.
+
+    - Exact tier: LRU/TTL map keyed by sha256(namespace + normalized message)
+    - Semantic tier (optional): cosine similarity over normalized embeddings,
+      stored in a fixed-size ring buffer so lookups are a single matrix-vector product.
+      It can be saved to disk on shutdown and loaded on startup for a warm cache.
+    """
+
+    def __init__(self, client=None, max_entries: int = 1024, ttl_seconds: int = 300,
+                 semantic_enabled: bool = False, similarity_threshold: float = 0.95,
+                 embedding_model: str = "text-embedding-3-small"):
+        self.client = client
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.semantic_enabled = semantic_enabled and client is not None
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self.logger = get_logger('app.services.response_cache')
+
+        self._exact: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+        # Semantic tier, allocated lazily once the embedding dimension is known
+        self._vectors: Optional[np.ndarray] = None
+        self._vector_times = np.zeros(max_entries, dtype=np.float64)
+        self._vector_keys: List[Optional[str]] = [None] * max_entries
+        self._vector_responses: List[Optional[str]] = [None] * max_entries
+        self._next_slot = 0
+
+        # Embeddings computed on a miss, reused by the following put()
+        self._pending_embeddings: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    @staticmethod
+    def _normalize(message: str) -> str:
+        """Normalize whitespace and case so trivially different messages share a key"""
+        return " ".join(message.split()).casefold()
+
+    def _key(self, message: str, namespace: str) -> str:
+        return hashlib.sha256(f"{namespace}\x00{self._normalize(message)}".encode()).hexdigest()
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return time.monotonic() - stored_at < self.ttl_seconds
+
+    async def _embed(self, message: str) -> np.ndarray:
+        response = await self.client.embeddings.create(model=self.embedding_model, input=self._normalize(message))
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def lookup(self, message: str, namespace: str = "") -> Optional[str]:
+        """Return a cached response for the message, or None on a miss"""
+        key = self._key(message, namespace)
+
+        entry = self._exact.get(key)
+        if entry is not None:
+            stored_at, response = entry
+            if self._is_fresh(stored_at):
+                self._exact.move_to_end(key)
+                self.logger.debug("🎯 Exact response cache hit")
+                return response
+            del self._exact[key]
+
+        if not self.semantic_enabled:
+            return None
+
+        try:
+            query = await self._embed(message)
+        except Exception as e:
+            self.logger.warning("⚠️ Embedding lookup failed, skipping semantic cache: %s", e)
+            return None
+
+        self._pending_embeddings[key] = query
+        while len(self._pending_embeddings) > self.max_entries:
+            self._pending_embeddings.popitem(last=False)
+
+        if self._vectors is None:
+            return None
+
+        scores = self._vectors @ query
+        # Ignore empty and expired slots
+        scores[time.monotonic() - self._vector_times >= self.ttl_seconds] = -1.0
+        # Other namespaces are masked before argmax so a closer foreign entry cannot hide a match
+        prefix = f"{namespace}\x00"
+        scores[[key is None or not key.startswith(prefix) for key in self._vector_keys]] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            self.logger.debug("🎯 Semantic response cache hit (similarity %.3f)", scores[best])
+            return self._vector_responses[best]
+
+        return None
+
+    async def put(self, message: str, response: str, namespace: str = ""):
+        """Store a response for the message in both tiers"""
+        key = self._key(message, namespace)
+        now = time.monotonic()
+
+        self._exact[key] = (now, response)
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.max_entries:
+            self._exact.popitem(last=False)
+
+        if not self.semantic_enabled:
+            return
+
+        embedding = self._pending_embeddings.pop(key, None)
+        if embedding is None:
+            try:
+                embedding = await self._embed(message)
+            except Exception as e:
+                self.logger.warning("⚠️ Embedding failed, response cached in exact tier only: %s", e)
+                return
+
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+
+        slot = self._next_slot
+        self._vectors[slot] = embedding
+        self._vector_times[slot] = now
+        self._vector_keys[slot] = f"{namespace}\x00{key}"
+        self._vector_responses[slot] = response
+        self._next_slot = (slot + 1) % self.max_entries
+
+    def clear(self):
+        """Drop all cached responses"""
+        self._exact.clear()
+        self._pending_embeddings.clear()
+        self._vectors = None
+        self._vector_times[:] = 0
+        self._vector_keys = [None] * self.max_entries
+        self._vector_responses = [None] * self.max_entries
+        self._next_slot = 0
+
+    def save(self, path: str):
+        """Write the semantic tier to an .npz file, entry ages are kept so the TTL still applies after a restart"""
+        if self._vectors is None:
+            return
+        ages = time.monotonic() - self._vector_times
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    vectors=self._vectors,
+                    ages=ages,
+                    saved_at=np.float64(time.time()),
+                    keys=np.array([key or "" for key in self._vector_keys]),
+                    responses=np.array([response or "" for response in self._vector_responses]),
+                    next_slot=np.int64(self._next_slot),
+                    embedding_model=np.array(self.embedding_model)
+                )
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning("⚠️ Failed to save semantic response cache to %s: %s", path, e)
+            return
+        self.logger.info("💾 Saved semantic response cache to %s", path)
+
+    def load(self, path: str) -> bool:
+        """Restore the semantic tier saved by save(), returns False if the file is missing or incompatible"""
+        if not self.semantic_enabled or not os.path.exists(path):
+            return False
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["embedding_model"]) != self.embedding_model or data["vectors"].shape[0] != self.max_entries:
+                    self.logger.warning("⚠️ Semantic response cache at %s was saved with other settings, ignoring it", path)
+                    return False
+                # Time spent down counts towards the TTL
+                downtime = max(time.time() - float(data["saved_at"]), 0.0)
+                keys = [str(key) or None for key in data["keys"]]
+                self._vectors = data["vectors"].astype(np.float32)
+                self._vector_times = np.where([key is not None for key in keys],
+                                              time.monotonic() - data["ages"] - downtime, 0.0)
+                self._vector_keys = keys
+                self._vector_responses = [str(response) if key else None for key, response in zip(keys, data["responses"])]
+                self._next_slot = int(data["next_slot"])
+        except Exception as e:
+            self.logger.warning("⚠️ Failed to load semantic response cache from %s: %s", path, e)
+            return False
+
+        self.logger.info("💾 Loaded semantic response cache from %s", path)
+        return True
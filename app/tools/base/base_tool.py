@@ -1,6 +1,13 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
+from app.core.config import get_settings
 from app.core.logging_config import get_logger
+from app.tools.base.result_cache import ToolResultCache
+
+
+# Shared by all tools, keys are prefixed with the tool name
+_settings = get_settings()
+tool_result_cache = ToolResultCache(max_entries=_settings.tool_cache_max_entries)
 
 
 class BaseTool(ABC):
@@ -11,10 +18,28 @@ class BaseTool(ABC):
     This provides a consistent interface for tool registration, execution, and metadata.
     """
 
+    # Seconds a successful result is reused for the same normalized input, 0 disables caching
+    cache_ttl_seconds: float = 0
+
     def __init__(self):
         self.logger = get_logger(f'app.tools.{self.get_tool_name()}')
         self.logger.info(f"🔧 {self.get_tool_name()} tool initialized")
 
+    def get_cached_result(self, *key) -> Optional[str]:
+        """Return a cached successful result for the given normalized input"""
+        if not self.cache_ttl_seconds or not _settings.tool_cache_enabled:
+            return None
+        result = tool_result_cache.get((self.get_tool_name(), *key))
+        if result is not None:
+            self.logger.info("🎯 Tool cache hit for %s", key)
+        return result
+
+    def cache_result(self, result: str, *key, ttl_seconds: Optional[float] = None) -> str:
+        """Cache a successful result for the given normalized input and return it, ttl_seconds overrides the tool TTL"""
+        if self.cache_ttl_seconds and _settings.tool_cache_enabled:
+            tool_result_cache.put((self.get_tool_name(), *key), result, ttl_seconds or self.cache_ttl_seconds)
+        return result
+
     @abstractmethod
     def get_tool_name(self) -> str:
         """
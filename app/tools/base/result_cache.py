@@ -0,0 +1,47 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+class ToolResultCache:
+    """
+    Thread-safe LRU cache for tool results with a TTL per entry.
+
+    Tools run concurrently in the tool thread pool, so all access goes through a
+    lock. Entries expire after the TTL given when they were stored, letting each
+    tool pick its own staleness bound (weather changes faster than Wikipedia).
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return the cached result, None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: Hashable, result: str, ttl_seconds: float):
+        """Store a result for ttl_seconds, evicting the least recently used entries beyond max_entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,17 +1,32 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any
-import json
+from app.core.config import get_settings
 from app.utils.error_handlers import handle_tool_errors, log_request_response, APIConnectionError
 from app.core.logging_config import log_request_start, log_request_end, log_error_with_context
 from app.tools.base.base_tool import BaseTool
 
 
+# Fallback titles tried concurrently when the city page is not found, in priority order
+CITY_VARIATIONS = ("{}_city", "{},_United_States", "{},_UK")
+CITY_RESPONSE_TEMPLATE = "🏙️ **{title}**\n\n{extract}{location}{link}"
+
+
 class CityTool(BaseTool):
     """Tool for fetching city information from Wikipedia API"""
 
+    cache_ttl_seconds = 86400  # Wikipedia summaries rarely change
+    not_found_ttl_seconds = 3600  # Unknown names skip the variation lookups until a page may have been created
+
     def __init__(self):
         super().__init__()
         self.wikipedia_api_url = "https://en.wikipedia.org/api/rest_v1/page/summary"
+        # Keep-alive connections shared by the tool threads, avoids a TLS handshake per lookup
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'MultiDomainChatbot/1.0 (https://example.com/contact)'
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=get_settings().tool_max_workers))
+        self.variation_executor = ThreadPoolExecutor(max_workers=len(CITY_VARIATIONS), thread_name_prefix="wikipedia")
 
     @handle_tool_errors("Wikipedia")
     @log_request_response("CityTool")
@@ -28,7 +43,7 @@ class CityTool(BaseTool):
         request_id = log_request_start(self.logger, "GET", "Wikipedia API", {"city": city_name})
 
         try:
-            self.logger.info(f"🏙️ Fetching city information for: {city_name}")
+            self.logger.info("🏙️ Fetching city information for: %s", city_name)
 
             if not city_name or not city_name.strip():
                 self.logger.warning("❌ Empty city name provided")
@@ -36,55 +51,47 @@ class CityTool(BaseTool):
                 return "Please provide a valid city name."
 
             city_name = city_name.strip().title()
-            self.logger.debug(f"🔍 Normalized city name: {city_name}")
+            self.logger.debug("🔍 Normalized city name: %s", city_name)
+
+            cached = self.get_cached_result(city_name)
+            if cached is not None:
+                log_request_end(self.logger, request_id, 200, {"cached": True})
+                return cached
 
             # Make request to Wikipedia API
             url = f"{self.wikipedia_api_url}/{city_name}"
-            headers = {
-                'User-Agent': 'MultiDomainChatbot/1.0 (https://example.com/contact)'
-            }
 
-            self.logger.debug(f"📡 Making request to: {url}")
-            response = requests.get(url, headers=headers, timeout=10)
-            self.logger.debug(f"📥 Wikipedia response: {response.status_code}")
+            self.logger.debug("📡 Making request to: %s", url)
+            response = self.session.get(url, timeout=10)
+            self.logger.debug("📥 Wikipedia response: %s", response.status_code)
 
             if response.status_code == 200:
                 data = response.json()
-                self.logger.info(f"✅ Successfully fetched Wikipedia data for {city_name}")
-                result = self._format_city_response(data, city_name)
+                self.logger.info("✅ Successfully fetched Wikipedia data for %s", city_name)
+                result = self.cache_result(self._format_city_response(data, city_name), city_name)
                 log_request_end(self.logger, request_id, 200, {"response_length": len(result)})
                 return result
 
             elif response.status_code == 404:
-                self.logger.warning(f"🔍 City '{city_name}' not found, trying variations")
-                # Try with different variations
-                variations = [
-                    f"{city_name}_city",
-                    f"{city_name},_United_States",
-                    f"{city_name},_UK"
-                ]
-
-                for variation in variations:
-                    try:
-                        self.logger.debug(f"🔄 Trying variation: {variation}")
-                        var_url = f"{self.wikipedia_api_url}/{variation}"
-                        var_response = requests.get(var_url, headers=headers, timeout=10)
-                        if var_response.status_code == 200:
-                            data = var_response.json()
-                            self.logger.info(f"✅ Found match with variation: {variation}")
-                            result = self._format_city_response(data, city_name)
-                            log_request_end(self.logger, request_id, 200, {"variation_used": variation})
-                            return result
-                    except Exception as e:
-                        self.logger.debug(f"❌ Variation {variation} failed: {str(e)}")
-                        continue
-
-                self.logger.warning(f"❌ No variations found for city: {city_name}")
+                self.logger.warning("🔍 City '%s' not found, trying variations", city_name)
+                # Fetch all variations at once, the first one found in priority order wins
+                variations = [variation.format(city_name) for variation in CITY_VARIATIONS]
+                for variation, data in zip(variations, self.variation_executor.map(self._fetch_variation, variations)):
+                    if data is not None:
+                        self.logger.info("✅ Found match with variation: %s", variation)
+                        result = self.cache_result(self._format_city_response(data, city_name), city_name)
+                        log_request_end(self.logger, request_id, 200, {"variation_used": variation})
+                        return result
+
+                self.logger.warning("❌ No variations found for city: %s", city_name)
                 log_request_end(self.logger, request_id, 404)
-                return f"Sorry, I couldn't find information about '{city_name}' on Wikipedia. Please check the spelling or try a more specific name."
+                return self.cache_result(
+                    f"Sorry, I couldn't find information about '{city_name}' on Wikipedia. Please check the spelling or try a more specific name.",
+                    city_name, ttl_seconds=self.not_found_ttl_seconds
+                )
 
             else:
-                self.logger.error(f"❌ Wikipedia API error: {response.status_code}")
+                self.logger.error("❌ Wikipedia API error: %s", response.status_code)
                 log_request_end(self.logger, request_id, response.status_code)
                 return f"Sorry, I encountered an error while searching for '{city_name}'. Please try again later."
 
@@ -108,6 +115,17 @@ class CityTool(BaseTool):
             log_request_end(self.logger, request_id, 500)
             return f"An unexpected error occurred: {str(e)}"
 
+    def _fetch_variation(self, variation: str) -> Optional[Dict[str, Any]]:
+        """Return the Wikipedia summary for a title variation, None if it is not found or fails"""
+        try:
+            self.logger.debug("🔄 Trying variation: %s", variation)
+            response = self.session.get(f"{self.wikipedia_api_url}/{variation}", timeout=10)
+            if response.status_code == 200:
+                return response.json()
+        except Exception as e:
+            self.logger.debug("❌ Variation %s failed: %s", variation, e)
+        return None
+
     def _format_city_response(self, data: Dict[Any, Any], city_name: str) -> str:
         """
         Format the Wikipedia API response into a readable format
@@ -119,35 +137,20 @@ class CityTool(BaseTool):
         Returns:
             str: Formatted response
         """
-        try:
-            title = data.get('title', city_name)
-            extract = data.get('extract', '')
-
-            # Get coordinates if available
-            coordinates = data.get('coordinates', {})
-            lat = coordinates.get('lat')
-            lon = coordinates.get('lon')
-
-            response = f"🏙️ **{title}**\n\n"
-
-            if extract:
-                # Limit extract to reasonable length
-                if len(extract) > 500:
-                    extract = extract[:497] + "..."
-                response += f"{extract}\n\n"
-
-            if lat and lon:
-                response += f"📍 **Location**: {lat:.4f}°, {lon:.4f}°\n"
-
-            # Add Wikipedia URL if available
-            if 'content_urls' in data and 'desktop' in data['content_urls']:
-                wikipedia_url = data['content_urls']['desktop']['page']
-                response += f"🔗 [Read more on Wikipedia]({wikipedia_url})"
-
-            return response.strip()
-
-        except Exception as e:
-            return f"Found information about {city_name}, but couldn't format it properly: {str(e)}"
+        extract = data.get('extract') or ''
+        if len(extract) > 500:
+            extract = extract[:497] + "..."
+
+        coordinates = data.get('coordinates') or {}
+        lat, lon = coordinates.get('lat'), coordinates.get('lon')
+        wikipedia_url = ((data.get('content_urls') or {}).get('desktop') or {}).get('page')
+
+        return CITY_RESPONSE_TEMPLATE.format(
+            title=data.get('title', city_name),
+            extract=f"{extract}\n\n" if extract else "",
+            location=f"📍 **Location**: {lat:.4f}°, {lon:.4f}°\n" if lat is not None and lon is not None else "",
+            link=f"🔗 [Read more on Wikipedia]({wikipedia_url})" if wikipedia_url else ""
+        ).strip()
 
     def get_tool_name(self) -> str:
         """Return the tool identifier"""
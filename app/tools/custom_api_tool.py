@@ -1,6 +1,7 @@
 import requests
 from typing import Optional, Dict, Any
-import json
+import logging
+import orjson
 from app.utils.error_handlers import handle_tool_errors, log_request_response, APIConnectionError
 from app.core.logging_config import log_request_start, log_request_end, log_error_with_context
 from app.tools.base.base_tool import BaseTool
@@ -28,8 +29,8 @@ class CustomAPITool(BaseTool):
         request_id = log_request_start(self.logger, "GET", self.api_endpoint, {"tool_name": self.tool_name})
 
         try:
-            self.logger.info(f"🔧 Calling custom API: {self.tool_name} -> {self.api_endpoint}")
-            self.logger.debug(f"🔧 API parameters: {kwargs}")
+            self.logger.info("🔧 Calling custom API: %s -> %s", self.tool_name, self.api_endpoint)
+            self.logger.debug("🔧 API parameters: %s", kwargs)
 
             headers = {
                 'User-Agent': 'MultiDomainChatbot/1.0 (https://example.com/contact)',
@@ -43,28 +44,29 @@ class CustomAPITool(BaseTool):
                 if param_name in kwargs:
                     params[param_name] = kwargs[param_name]
 
-            self.logger.info(f"📡 Custom API request to: {self.api_endpoint}")
-            self.logger.info(f"📋 Query parameters: {params}")
+            self.logger.info("📡 Custom API request to: %s", self.api_endpoint)
+            self.logger.info("📋 Query parameters: %s", params)
             response = requests.get(self.api_endpoint, headers=headers, params=params, timeout=30)
-            self.logger.info(f"📥 Custom API response: {response.status_code}")
+            self.logger.info("📥 Custom API response: %s", response.status_code)
 
             if response.status_code == 200:
                 try:
                     # Try to parse as JSON
-                    result = response.json()
-                    self.logger.info(f"✅ Successfully fetched data from {self.tool_name}")
-                    self.logger.info(f"🔍 Custom API response data: {json.dumps(result, indent=2)}")
+                    result = orjson.loads(response.content)
+                    self.logger.info("✅ Successfully fetched data from %s", self.tool_name)
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("🔍 Custom API response data: %s", orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
                     log_request_end(self.logger, request_id, 200, {"response_length": len(result)})
                     return result
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     # Return raw text if not JSON
                     result = response.text
-                    self.logger.info(f"✅ Successfully fetched text data from {self.tool_name}")
+                    self.logger.info("✅ Successfully fetched text data from %s", self.tool_name)
                     log_request_end(self.logger, request_id, 200, {"response_length": len(result)})
                     return result
 
             else:
-                self.logger.error(f"❌ Custom API error: {response.status_code}")
+                self.logger.error("❌ Custom API error: %s", response.status_code)
                 log_request_end(self.logger, request_id, response.status_code)
                 return f"Sorry, the {self.tool_name} API returned an error (status {response.status_code}). Please try again later."
 
@@ -88,9 +90,6 @@ class CustomAPITool(BaseTool):
             log_request_end(self.logger, request_id, 500)
             return f"An unexpected error occurred: {str(e)}"
 
-        except Exception as e:
-            return f"Response received, but couldn't format it properly: {json.dumps(data, indent=2)}"
-
     def get_tool_name(self) -> str:
         """Return the tool identifier"""
         return self.tool_name.lower().replace(" ", "_")
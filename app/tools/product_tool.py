@@ -1,5 +1,5 @@
 from typing import List, Dict, Any
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, func
 from app.core.database import SessionLocal
 from app.models.product import Product
 from app.core.logging_config import log_request_start, log_request_end, log_error_with_context
@@ -9,6 +9,8 @@ from app.tools.base.base_tool import BaseTool
 class ProductTool(BaseTool):
     """Tool for searching products in the database"""
 
+    cache_ttl_seconds = 3600  # Catalog changes are picked up within an hour
+
     def __init__(self):
         super().__init__()
 
@@ -25,7 +27,7 @@ class ProductTool(BaseTool):
         request_id = log_request_start(self.logger, "QUERY", "Product Database", {"query": query})
 
         try:
-            self.logger.info(f"🛍️ Searching products for query: {query}")
+            self.logger.info("🛍️ Searching products for query: %s", query)
 
             if not query or not query.strip():
                 self.logger.warning("❌ Empty product search query provided")
@@ -33,33 +35,44 @@ class ProductTool(BaseTool):
                 return "Please provide a search term for products."
 
             query = query.strip().lower()
-            self.logger.debug(f"🔍 Normalized query: {query}")
+            self.logger.debug("🔍 Normalized query: %s", query)
+
+            cached = self.get_cached_result(query)
+            if cached is not None:
+                log_request_end(self.logger, request_id, 200, {"cached": True})
+                return cached
 
             # Get database session
             self.logger.debug("📊 Opening database session")
             db = SessionLocal()
 
             try:
-                # Search products using case-insensitive matching
-                search_filter = or_(
-                    Product.name.ilike(f"%{query}%"),
-                    Product.description.ilike(f"%{query}%"),
-                    Product.category.ilike(f"%{query}%"),
-                    Product.brand.ilike(f"%{query}%")
-                )
-
+                # Full-text search on the GIN indexed search document
                 self.logger.debug("🔎 Executing product search query")
-                products = db.query(Product).filter(search_filter).limit(10).all()
+                products = db.query(Product).filter(
+                    Product.tsv.op('@@')(func.plainto_tsquery('english', query))
+                ).limit(10).all()
+
+                if not products:
+                    # Fall back to case-insensitive substring matching for partial words
+                    self.logger.debug("🔎 No full-text matches, falling back to substring search")
+                    search_filter = or_(
+                        Product.name.ilike(f"%{query}%"),
+                        Product.description.ilike(f"%{query}%"),
+                        Product.category.ilike(f"%{query}%"),
+                        Product.brand.ilike(f"%{query}%")
+                    )
+                    products = db.query(Product).filter(search_filter).limit(10).all()
 
                 product_count = len(products)
-                self.logger.info(f"✅ Found {product_count} products matching '{query}'")
+                self.logger.info("✅ Found %s products matching '%s'", product_count, query)
 
                 if not products:
-                    self.logger.info(f"❌ No products found for query: {query}")
+                    self.logger.info("❌ No products found for query: %s", query)
                     log_request_end(self.logger, request_id, 200, {"products_found": 0})
                     return f"No products found matching '{query}'. Try searching with different keywords."
 
-                result = self._format_product_results(products, query)
+                result = self.cache_result(self._format_product_results(products, query), query)
                 log_request_end(self.logger, request_id, 200, {"products_found": product_count, "response_length": len(result)})
                 return result
 
@@ -22,6 +22,10 @@ class ToolRegistry:
         self.logger = get_logger('app.tools.registry')
         self._tools: Dict[str, BaseTool] = {}
         self._tool_classes: Dict[str, Type[BaseTool]] = {}
+        # Built on first use and reused until the tools are reloaded
+        self._functions: Optional[Dict[str, callable]] = None
+        self._definitions: Optional[List[Dict[str, Any]]] = None
+        self._definitions_by_name: Optional[Dict[str, Dict[str, Any]]] = None
         self.settings = get_settings()
 
         self.logger.info("🔧 Tool registry initializing...")
@@ -168,8 +172,13 @@ class ToolRegistry:
         Get all available functions from active tools for OpenAI integration.
 
         Returns:
-            Dict[str, callable]: Mapping of function names to callables
+            Dict[str, callable]: Mapping of function names to callables (a copy, safe to extend)
         """
+        if self._functions is None:
+            self._functions = self._build_functions()
+        return dict(self._functions)
+
+    def _build_functions(self) -> Dict[str, callable]:
         functions = {}
 
         for tool_name, tool in self._tools.items():
@@ -190,8 +199,30 @@ class ToolRegistry:
         Get OpenAI tool definitions for all active tools.
 
         Returns:
-            List[Dict[str, Any]]: List of OpenAI tool definitions
+            List[Dict[str, Any]]: List of OpenAI tool definitions (a copy, safe to extend)
+        """
+        if self._definitions is None:
+            self._definitions = self._build_definitions()
+        return list(self._definitions)
+
+    def get_openai_tool_definition(self, function_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the OpenAI tool definition of a single function.
+
+        Args:
+            function_name (str): Function name as used in the OpenAI schema
+
+        Returns:
+            Optional[Dict[str, Any]]: Tool definition or None if no active tool provides it
         """
+        if self._definitions_by_name is None:
+            self._definitions_by_name = {
+                definition.get('function', {}).get('name'): definition
+                for definition in self.get_openai_tool_definitions()
+            }
+        return self._definitions_by_name.get(function_name)
+
+    def _build_definitions(self) -> List[Dict[str, Any]]:
         definitions = []
 
         for tool_name, tool in self._tools.items():
@@ -211,6 +242,8 @@ class ToolRegistry:
             except Exception as e:
                 self.logger.error(f"❌ Failed to get schema from tool '{tool_name}': {str(e)}")
 
+        # Tools are discovered in filesystem order, sort so every worker sends the same prompt prefix
+        definitions.sort(key=lambda definition: definition.get('function', {}).get('name', ''))
         return definitions
 
     def get_registry_info(self) -> Dict[str, Any]:
@@ -237,6 +270,9 @@ class ToolRegistry:
         self.logger.info("🔄 Reloading tools...")
         self._tools.clear()
         self._tool_classes.clear()
+        self._functions = None
+        self._definitions = None
+        self._definitions_by_name = None
         self._discover_tools()
         self._load_active_tools()
         self.logger.info(f"✅ Tools reloaded: {len(self._tools)} active tools")
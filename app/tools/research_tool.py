@@ -1,6 +1,5 @@
 import requests
 from typing import Optional, Dict, Any, List
-import json
 from app.core.logging_config import log_request_start, log_request_end, log_error_with_context
 from app.tools.base.base_tool import BaseTool
 
@@ -8,6 +7,8 @@ from app.tools.base.base_tool import BaseTool
 class ResearchTool(BaseTool):
     """Tool for fetching research information from Semantic Scholar API"""
 
+    cache_ttl_seconds = 3600
+
     def __init__(self):
         super().__init__()
         self.base_url = "https://api.semanticscholar.org/graph/v1"
@@ -26,7 +27,7 @@ class ResearchTool(BaseTool):
         request_id = log_request_start(self.logger, "GET", "Semantic Scholar API", {"topic": topic})
 
         try:
-            self.logger.info(f"📚 Searching research papers for topic: {topic}")
+            self.logger.info("📚 Searching research papers for topic: %s", topic)
 
             if not topic or not topic.strip():
                 self.logger.warning("❌ Empty research topic provided")
@@ -34,7 +35,12 @@ class ResearchTool(BaseTool):
                 return "Please provide a valid research topic."
 
             topic = topic.strip()
-            self.logger.debug(f"🔍 Normalized topic: {topic}")
+            self.logger.debug("🔍 Normalized topic: %s", topic)
+
+            cached = self.get_cached_result(topic.lower())
+            if cached is not None:
+                log_request_end(self.logger, request_id, 200, {"cached": True})
+                return cached
 
             # Make request to Semantic Scholar API
             params = {
@@ -47,20 +53,20 @@ class ResearchTool(BaseTool):
                 'User-Agent': 'MultiDomainChatbot/1.0 (research-assistant)',
             }
 
-            self.logger.debug(f"📡 Making request to: {self.search_url} with limit: {params['limit']}")
+            self.logger.debug("📡 Making request to: %s with limit: %s", self.search_url, params['limit'])
             response = requests.get(self.search_url, params=params, headers=headers, timeout=15)
-            self.logger.debug(f"📥 Semantic Scholar response: {response.status_code}")
+            self.logger.debug("📥 Semantic Scholar response: %s", response.status_code)
 
             if response.status_code == 200:
                 data = response.json()
                 paper_count = len(data.get('data', []))
-                self.logger.info(f"✅ Successfully fetched {paper_count} research papers for {topic}")
-                result = self._format_research_response(data, topic)
+                self.logger.info("✅ Successfully fetched %s research papers for %s", paper_count, topic)
+                result = self.cache_result(self._format_research_response(data, topic), topic.lower())
                 log_request_end(self.logger, request_id, 200, {"papers_found": paper_count, "response_length": len(result)})
                 return result
 
             elif response.status_code == 400:
-                self.logger.warning(f"❌ Invalid search query: {topic}")
+                self.logger.warning("❌ Invalid search query: %s", topic)
                 log_request_end(self.logger, request_id, 400)
                 return f"Invalid search query for '{topic}'. Please try a different search term."
 
@@ -75,7 +81,7 @@ class ResearchTool(BaseTool):
                 return "Research service is temporarily unavailable. Please try again later."
 
             else:
-                self.logger.error(f"❌ Semantic Scholar API error: {response.status_code}")
+                self.logger.error("❌ Semantic Scholar API error: %s", response.status_code)
                 log_request_end(self.logger, request_id, response.status_code)
                 return f"Sorry, I encountered an error while searching for research on '{topic}'. Please try again later."
 
@@ -9,6 +9,8 @@ from app.tools.base.base_tool import BaseTool
 class WeatherTool(BaseTool):
     """Tool for fetching weather information from OpenWeatherMap API"""
 
+    cache_ttl_seconds = 300  # OpenWeatherMap updates current conditions every few minutes
+
     def __init__(self):
         super().__init__()
         settings = get_settings()
@@ -30,7 +32,7 @@ class WeatherTool(BaseTool):
         request_id = log_request_start(self.logger, "GET", "OpenWeatherMap API", {"city": city_name})
 
         try:
-            self.logger.info(f"🌤️ Fetching weather information for: {city_name}")
+            self.logger.info("🌤️ Fetching weather information for: %s", city_name)
 
             if not city_name or not city_name.strip():
                 self.logger.warning("❌ Empty city name provided")
@@ -38,7 +40,12 @@ class WeatherTool(BaseTool):
                 return "Please provide a valid city name."
 
             city_name = city_name.strip()
-            self.logger.debug(f"🔍 Normalized city name: {city_name}")
+            self.logger.debug("🔍 Normalized city name: %s", city_name)
+
+            cached = self.get_cached_result(city_name.lower())
+            if cached is not None:
+                log_request_end(self.logger, request_id, 200, {"cached": True})
+                return cached
 
             # Check if API key is available
             if not self.api_key or self.api_key == "test-weather-key":
@@ -55,14 +62,15 @@ class WeatherTool(BaseTool):
                 'units': 'metric'  # Use Celsius
             }
 
-            self.logger.debug(f"📡 Making request to: {self.base_url} with params: {list(params.keys())}")
+            self.logger.debug("📡 Making request to: %s with params: %s", self.base_url, list(params.keys()))
             response = requests.get(self.base_url, params=params, timeout=10)
-            self.logger.debug(f"📥 Weather API response: {response.status_code}")
+            self.logger.debug("📥 Weather API response: %s", response.status_code)
 
             if response.status_code == 200:
                 data = response.json()
-                self.logger.info(f"✅ Successfully fetched weather data for {city_name} with response: {data}")
-                result = self._format_weather_response(data)
+                self.logger.info("✅ Successfully fetched weather data for %s", city_name)
+                self.logger.debug("📥 Weather data: %s", data)
+                result = self.cache_result(self._format_weather_response(data), city_name.lower())
                 log_request_end(self.logger, request_id, 200, {"response_length": len(result)})
                 return result
 
@@ -72,7 +80,7 @@ class WeatherTool(BaseTool):
                 return "Weather service authentication failed. Please check the API key configuration."
 
             elif response.status_code == 404:
-                self.logger.warning(f"❌ City '{city_name}' not found in weather API")
+                self.logger.warning("❌ City '%s' not found in weather API", city_name)
                 log_request_end(self.logger, request_id, 404)
                 return f"Sorry, I couldn't find weather information for '{city_name}'. Please check the spelling or try a different city name."
 
@@ -82,7 +90,7 @@ class WeatherTool(BaseTool):
                 return "Weather service is temporarily unavailable due to rate limiting. Please try again later."
 
             else:
-                self.logger.error(f"❌ Weather API error: {response.status_code}")
+                self.logger.error("❌ Weather API error: %s", response.status_code)
                 log_request_end(self.logger, request_id, response.status_code)
                 return f"Sorry, I encountered an error while fetching weather for '{city_name}'. Please try again later."
 
@@ -1,19 +1,39 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.chat import router as chat_router
-from app.chat.gradio_interface import create_chat_interface
-from app.core.logging_config import get_logger
-import gradio as gr
+from app.core.config import get_settings
+from app.core.logging_config import get_logger, setup_logging
+
+# Initialize logging before the app modules are imported, they log while initializing
+setup_logging()
+
+from app.api.chat import router as chat_router, response_cache  # noqa: E402
+from app.services.openai_service import aclose_http_clients, openai_service  # noqa: E402
+from app.chat.gradio_interface import create_chat_interface  # noqa: E402
+import gradio as gr  # noqa: E402
 
-# Initialize logging
 logger = get_logger('app.main')
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    settings = get_settings()
+    if settings.semantic_cache_path:
+        response_cache.save(settings.semantic_cache_path)
+    # Close pooled OpenAI and Redis connections cleanly on shutdown
+    await aclose_http_clients()
+    await openai_service.conversations.aclose()
+
 # Create FastAPI app
 app = FastAPI(
     title="Multi-Domain AI Chatbot",
     description="A chatbot that can handle cities, weather, research, and product queries",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 logger.info("🚀 FastAPI application initialized")
@@ -37,6 +57,7 @@ async def root():
         "message": "Multi-Domain AI Chatbot API",
         "endpoints": {
             "chat": "/api/chat",
+            "chat_stream": "/api/chat/stream",
             "clear_chat": "/api/chat/clear",
             "chat_history": "/api/chat/history",
             "gradio_ui": "/gradio"
@@ -65,10 +86,19 @@ if __name__ == "__main__":
     print("🔗 API Docs: http://localhost:8000/docs")
     print("❤️ Health Check: http://localhost:8000/health")
 
+    settings = get_settings()
+    if settings.workers > 1 and not settings.redis_url:
+        logger.warning("⚠️ Running multiple workers without REDIS_URL, each worker keeps its own conversations")
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        # Auto-reload only supports a single worker
+        reload=settings.workers == 1,
+        workers=settings.workers,
+        # uvloop and httptools are used when installed
+        loop="auto",
+        http="auto",
         log_level="warning"  # Let our custom logging handle most output
-    )
\ No newline at end of file
+    )
@@ -1,10 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, AsyncMock, patch
 import json
 
 # Import the FastAPI app
 from main import app
+from app.api.chat import response_cache
 
 client = TestClient(app)
 
@@ -12,6 +13,9 @@ client = TestClient(app)
 class TestChatAPI:
     """Test cases for the chat API endpoints"""
 
+    def setup_method(self):
+        response_cache.clear()
+
     def test_root_endpoint(self):
         """Test the root endpoint returns correct information"""
         response = client.get("/")
@@ -29,15 +33,15 @@ class TestChatAPI:
         assert data["status"] == "healthy"
         assert "chatbot" in data["service"]
 
-    @patch('app.api.chat.openai_service')
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
     def test_chat_endpoint_success(self, mock_service):
         """Test successful chat request"""
         # OpenAI service now returns a tuple (response, conversation_id)
-        mock_service.chat.return_value = ("Hello! How can I help you today?", "test_conversation_id")
+        mock_service.achat = AsyncMock(return_value=("Hello! How can I help you today?", "test_conversation_id"))
 
         response = client.post(
             "/api/chat",
-            json={"message": "Hello"}
+            json={"message": "Tell me about Tokyo"}
         )
 
         assert response.status_code == 200
@@ -48,19 +52,90 @@ class TestChatAPI:
         assert data["conversation_id"] == "test_conversation_id"
 
         # Verify the service was called with correct parameters
-        mock_service.chat.assert_called_once_with("Hello", None, None, None)
+        mock_service.achat.assert_called_once_with("Tell me about Tokyo", None, None, None)
 
     def test_chat_endpoint_empty_message(self):
         """Test chat endpoint with empty message"""
+        for message in ["", "   "]:
+            response = client.post(
+                "/api/chat",
+                json={"message": message}
+            )
+
+            assert response.status_code == 422
+            data = response.json()
+            assert "detail" in data
+            assert data["detail"][0]["loc"] == ["body", "message"]
+
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
+    def test_chat_endpoint_greeting_answered_directly(self, mock_service):
+        """Test that greetings are answered without calling the model"""
+        mock_service.achat = AsyncMock()
+        mock_service.record_exchange.return_value = "greeting_conversation"
+
+        response = client.post("/api/chat", json={"message": "Hello!"})
+
+        assert response.status_code == 200
+        assert response.json()["conversation_id"] == "greeting_conversation"
+        mock_service.achat.assert_not_called()
+
+    def test_chat_endpoint_message_too_long(self):
+        """Test chat endpoint rejects oversized messages"""
+        response = client.post("/api/chat", json={"message": "a" * 10000})
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "message"]
+
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
+    def test_chat_endpoint_unknown_field(self, mock_service):
+        """Test chat endpoint ignores unknown request fields"""
+        mock_service.achat = AsyncMock(return_value=("Kyoto is the old capital.", "test_conversation_id"))
+
         response = client.post(
             "/api/chat",
-            json={"message": ""}
+            json={"message": "Tell me about Kyoto", "temperature": 0.2}
         )
 
-        assert response.status_code == 400
-        data = response.json()
-        assert "detail" in data
-        assert "empty" in data["detail"]
+        assert response.status_code == 200
+        mock_service.achat.assert_called_once_with("Tell me about Kyoto", None, None, None)
+
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
+    def test_chat_stream_endpoint(self, mock_service):
+        """Test the streaming chat endpoint emits server-sent events"""
+        async def astream(*args):
+            for delta in ["Tokyo is ", "the capital of Japan."]:
+                yield delta
+
+        mock_service.astream = astream
+        mock_service.model = "gpt-4o"
+
+        response = client.post(
+            "/api/chat/stream",
+            json={"message": "Tell me about Tokyo", "conversation_id": "stream_conversation", "filter_tools": ["city"]}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line[len("data: "):] for line in response.text.split("\n\n") if line]
+        assert json.loads(events[0]) == {"conversation_id": "stream_conversation"}
+        assert [json.loads(event)["delta"] for event in events[1:-1]] == ["Tokyo is ", "the capital of Japan."]
+        assert events[-1] == "[DONE]"
+
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
+    def test_chat_stream_endpoint_reports_errors(self, mock_service):
+        """Test the streaming chat endpoint ends with an error event when the store fails"""
+        mock_service.record_exchange = AsyncMock(side_effect=ConnectionError("store unavailable"))
+
+        response = client.post(
+            "/api/chat/stream",
+            json={"message": "hello", "conversation_id": "stream_error_conversation"}
+        )
+
+        assert response.status_code == 200
+        events = [line[len("data: "):] for line in response.text.split("\n\n") if line]
+        assert json.loads(events[0]) == {"conversation_id": "stream_error_conversation"}
+        assert json.loads(events[1]) == {"error": "Error processing message: store unavailable"}
+        assert events[-1] == "[DONE]"
 
     def test_chat_endpoint_missing_message(self):
         """Test chat endpoint with missing message field"""
@@ -71,14 +146,14 @@ class TestChatAPI:
 
         assert response.status_code == 422  # Validation error
 
-    @patch('app.api.chat.openai_service')
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
     def test_chat_endpoint_openai_error(self, mock_service):
         """Test chat endpoint when OpenAI service fails"""
-        mock_service.chat.side_effect = Exception("OpenAI API error")
+        mock_service.achat = AsyncMock(side_effect=Exception("OpenAI API error"))
 
         response = client.post(
             "/api/chat",
-            json={"message": "Hello"}
+            json={"message": "Tell me about Tokyo"}
         )
 
         assert response.status_code == 500
@@ -86,7 +161,7 @@ class TestChatAPI:
         assert "detail" in data
         assert "Error processing message" in data["detail"]
 
-    @patch('app.api.chat.openai_service')
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
     def test_clear_chat_endpoint(self, mock_service):
         """Test the clear chat endpoint"""
         mock_service.clear_conversation.return_value = None
@@ -98,7 +173,7 @@ class TestChatAPI:
         assert "message" in data
         assert "cleared" in data["message"].lower()
 
-    @patch('app.api.chat.openai_service')
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
     def test_get_chat_history_empty(self, mock_service):
         """Test getting empty chat history"""
         mock_service.get_conversation_history.return_value = []
@@ -113,13 +188,15 @@ class TestChatAPI:
         assert data["message_count"] == 0
         assert data["conversation_id"] == "test"
 
-    @patch('app.api.chat.openai_service')
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
     def test_get_chat_history_with_messages(self, mock_service):
         """Test getting chat history with messages"""
-        mock_service.conversations = {
+        mock_service.get_all_conversations.return_value = {
             "conv1": [{"role": "user", "content": "Hello"}],
             "conv2": [{"role": "assistant", "content": "Hi there!"}]
         }
+        mock_service.get_conversation_count.return_value = 2
+        mock_service.get_total_message_count.return_value = 2
 
         response = client.get("/api/chat/history")
 
@@ -131,10 +208,56 @@ class TestChatAPI:
         assert data["total_conversations"] == 2
         assert data["total_messages"] == 2
 
-    @patch('app.api.chat.openai_service')
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
+    def test_chat_endpoint_response_cache_hit(self, mock_service):
+        """Test that a repeated first-turn message is served from the response cache"""
+        mock_service.achat = AsyncMock(return_value=("Paris is the capital of France.", "conv_1"))
+        mock_service.record_exchange.return_value = "conv_2"
+
+        first = client.post("/api/chat", json={"message": "Tell me about Paris"})
+        second = client.post("/api/chat", json={"message": "tell me  about paris"})
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json()["response"] == "Paris is the capital of France."
+        assert second.json()["conversation_id"] == "conv_2"
+        mock_service.achat.assert_called_once()
+        mock_service.record_exchange.assert_called_once_with("tell me  about paris", "Paris is the capital of France.", None)
+
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
+    def test_chat_endpoint_response_cache_follow_up_turns(self, mock_service):
+        """Test that follow-up turns are only served from cache after an identical history"""
+        history = [{"role": "user", "content": "Tell me about Paris"}, {"role": "assistant", "content": "Paris is lovely."}]
+        mock_service.model = "gpt-4o"
+        mock_service.get_conversation_history.side_effect = lambda conversation_id: {
+            "conv_a": history, "conv_b": list(history), "conv_c": history[:1]
+        }[conversation_id]
+        mock_service.achat = AsyncMock(return_value=("About 2 million people.", "conv_a"))
+        mock_service.record_exchange.return_value = "conv_b"
+
+        client.post("/api/chat", json={"message": "What is its population?", "conversation_id": "conv_a"})
+        same_history = client.post("/api/chat", json={"message": "What is its population?", "conversation_id": "conv_b"})
+        client.post("/api/chat", json={"message": "What is its population?", "conversation_id": "conv_c"})
+
+        assert same_history.json()["response"] == "About 2 million people."
+        assert mock_service.achat.await_count == 2
+
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
+    def test_chat_endpoint_response_cache_keyed_by_system_prompt(self, mock_service):
+        """Test that responses cached under another system prompt are not reused"""
+        mock_service.model = "gpt-4o"
+        mock_service.achat = AsyncMock(return_value=("Paris is the capital of France.", "conv_1"))
+
+        client.post("/api/chat", json={"message": "Tell me about Paris"})
+        with patch('app.api.chat.SYSTEM_PROMPT_HASH', "changed"):
+            client.post("/api/chat", json={"message": "Tell me about Paris"})
+
+        assert mock_service.achat.await_count == 2
+
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
     def test_chat_endpoint_with_filter_tools(self, mock_service):
         """Test chat request with filter_tools parameter"""
-        mock_service.chat.return_value = ("Weather response", "test_conversation_id")
+        mock_service.achat = AsyncMock(return_value=("Weather response", "test_conversation_id"))
 
         response = client.post(
             "/api/chat",
@@ -151,14 +274,14 @@ class TestChatAPI:
         assert data["response"] == "Weather response"
 
         # Verify the service was called with filter_tools
-        mock_service.chat.assert_called_once_with(
+        mock_service.achat.assert_called_once_with(
             "What's the weather?", None, ["weather", "city"], None
         )
 
-    @patch('app.api.chat.openai_service')
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
     def test_chat_endpoint_with_custom_api(self, mock_service):
         """Test chat request with custom_api parameter"""
-        mock_service.chat.return_value = ("Custom API response", "test_conversation_id")
+        mock_service.achat = AsyncMock(return_value=("Custom API response", "test_conversation_id"))
 
         custom_tool = {
             "name": "search_repositories",
@@ -185,17 +308,17 @@ class TestChatAPI:
         assert data["response"] == "Custom API response"
 
         # Verify the service was called with custom_api
-        args = mock_service.chat.call_args[0]
+        args = mock_service.achat.call_args[0]
         assert args[0] == "Search for Python repos"  # message
         assert args[1] is None  # conversation_id
         assert args[2] is None  # filter_tools
         # custom_api is passed as 4th argument
         assert len(args) >= 4
 
-    @patch('app.api.chat.openai_service')
+    @patch('app.api.chat.openai_service', new_callable=AsyncMock)
     def test_chat_endpoint_with_conversation_id(self, mock_service):
         """Test chat request with conversation_id parameter"""
-        mock_service.chat.return_value = ("Continuing conversation", "existing_conv_id")
+        mock_service.achat = AsyncMock(return_value=("Continuing conversation", "existing_conv_id"))
 
         response = client.post(
             "/api/chat",
@@ -212,11 +335,34 @@ class TestChatAPI:
         assert data["conversation_id"] == "existing_conv_id"
 
         # Verify the service was called with conversation_id
-        mock_service.chat.assert_called_once_with(
+        mock_service.achat.assert_called_once_with(
             "Continue our chat", "existing_conv_id", None, None
         )
 
 
+    @patch('app.api.chat.batch_chat_service')
+    def test_chat_batch_endpoints(self, mock_batch_service):
+        """Test submitting a batch and retrieving its responses"""
+        mock_batch_service.submit = AsyncMock(return_value=("batch_1", "validating"))
+        mock_batch_service.results = AsyncMock(return_value=("completed", ["Hi!", None]))
+
+        response = client.post("/api/chat/batch", json={"messages": ["Hello", "Weather in Paris?"]})
+
+        assert response.status_code == 200
+        assert response.json() == {"batch_id": "batch_1", "status": "validating", "responses": None}
+        mock_batch_service.submit.assert_awaited_once_with(["Hello", "Weather in Paris?"])
+
+        response = client.get("/api/chat/batch/batch_1")
+
+        assert response.status_code == 200
+        assert response.json()["responses"] == ["Hi!", None]
+
+    def test_chat_batch_rejects_empty_messages(self):
+        """Test that a batch needs at least one non-empty message"""
+        assert client.post("/api/chat/batch", json={"messages": []}).status_code == 422
+        assert client.post("/api/chat/batch", json={"messages": ["  "]}).status_code == 422
+
+
 class TestAPIValidation:
     """Test API input validation"""
 
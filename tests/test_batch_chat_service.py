@@ -0,0 +1,94 @@
+import asyncio
+import orjson
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from app.services.batch_chat_service import BatchChatService
+
+
+SYSTEM_MESSAGE = {"role": "system", "content": "You are helpful."}
+
+
+def make_client(retrieve, output_lines=()):
+    content = SimpleNamespace(content=b"\n".join(orjson.dumps(line) for line in output_lines))
+    return SimpleNamespace(
+        files=SimpleNamespace(
+            create=AsyncMock(return_value=SimpleNamespace(id="file_in")),
+            content=AsyncMock(return_value=content)
+        ),
+        batches=SimpleNamespace(
+            create=AsyncMock(return_value=SimpleNamespace(id="batch_1", status="validating")),
+            retrieve=retrieve
+        )
+    )
+
+
+def make_batch(status, total=0, output_file_id=None):
+    return SimpleNamespace(status=status, output_file_id=output_file_id, request_counts=SimpleNamespace(total=total))
+
+
+def make_output_line(custom_id, content):
+    return {"custom_id": custom_id, "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}}}
+
+
+class TestBatchChatService:
+    """Test cases for BatchChatService"""
+
+    def test_submit_uploads_one_request_per_message(self):
+        client = make_client(AsyncMock())
+        service = BatchChatService(client, "gpt-4o", SYSTEM_MESSAGE)
+
+        batch_id, status = asyncio.run(service.submit(["Hello", "Weather in Paris?"]))
+
+        assert (batch_id, status) == ("batch_1", "validating")
+        _, data = client.files.create.await_args.kwargs["file"]
+        requests = [orjson.loads(line) for line in data.splitlines()]
+        assert [request["custom_id"] for request in requests] == ["0", "1"]
+        assert requests[1]["body"] == {"model": "gpt-4o", "messages": [SYSTEM_MESSAGE, {"role": "user", "content": "Weather in Paris?"}]}
+        assert client.files.create.await_args.kwargs["purpose"] == "batch"
+        client.batches.create.assert_awaited_once_with(
+            input_file_id="file_in", endpoint="/v1/chat/completions", completion_window="24h"
+        )
+
+    def test_results_are_ordered_by_custom_id(self):
+        retrieve = AsyncMock(return_value=make_batch("completed", total=3, output_file_id="file_out"))
+        client = make_client(retrieve, [make_output_line("2", "third"), make_output_line("0", "first")])
+        service = BatchChatService(client, "gpt-4o", SYSTEM_MESSAGE)
+
+        status, responses = asyncio.run(service.results("batch_1"))
+
+        assert status == "completed"
+        assert responses == ["first", None, "third"]
+
+    def test_results_pending_batch(self):
+        client = make_client(AsyncMock(return_value=make_batch("in_progress")))
+        service = BatchChatService(client, "gpt-4o", SYSTEM_MESSAGE)
+
+        assert asyncio.run(service.results("batch_1")) == ("in_progress", None)
+        client.files.content.assert_not_awaited()
+
+    def test_run_polls_with_backoff(self):
+        retrieve = AsyncMock(side_effect=[
+            make_batch("in_progress"),
+            make_batch("finalizing"),
+            make_batch("completed", total=1, output_file_id="file_out"),
+        ])
+        client = make_client(retrieve, [make_output_line("0", "Hi!")])
+        service = BatchChatService(client, "gpt-4o", SYSTEM_MESSAGE, poll_interval=1, max_poll_interval=1.5)
+
+        with patch("app.services.batch_chat_service.asyncio.sleep", AsyncMock()) as sleep:
+            responses = asyncio.run(service.run(["Hello"]))
+
+        assert responses == ["Hi!"]
+        assert [call.args[0] for call in sleep.await_args_list] == [1, 1.5]
+
+    def test_run_raises_on_failed_batch(self):
+        client = make_client(AsyncMock(return_value=make_batch("expired")))
+        service = BatchChatService(client, "gpt-4o", SYSTEM_MESSAGE)
+
+        with pytest.raises(RuntimeError, match="expired"):
+            asyncio.run(service.run(["Hello"]))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
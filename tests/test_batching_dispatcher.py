@@ -0,0 +1,171 @@
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from openai import RateLimitError
+from app.services.batching_dispatcher import BatchingDispatcher
+
+
+def make_client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def make_rate_limit_error():
+    response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class TestBatchingDispatcher:
+    """Test cases for BatchingDispatcher"""
+
+    def test_submit_returns_response(self):
+        create = AsyncMock(return_value="response")
+        dispatcher = BatchingDispatcher(make_client(create), window_ms=5)
+
+        result = asyncio.run(dispatcher.submit(model="gpt-4o", messages=[]))
+
+        assert result == "response"
+        create.assert_awaited_once_with(model="gpt-4o", messages=[])
+
+    def track_batches(self, dispatcher):
+        """Record the size of every batch the dispatcher collects"""
+        sizes = []
+        collect_batch = dispatcher._collect_batch
+
+        async def tracked():
+            batch = await collect_batch()
+            sizes.append(len(batch))
+            return batch
+
+        dispatcher._collect_batch = tracked
+        return sizes
+
+    def test_concurrent_requests_are_batched(self):
+        create = AsyncMock(side_effect=lambda **kwargs: kwargs["messages"])
+        dispatcher = BatchingDispatcher(make_client(create), window_ms=50)
+        sizes = self.track_batches(dispatcher)
+
+        async def run():
+            return await asyncio.gather(*(dispatcher.submit(messages=i) for i in range(5)))
+
+        assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+        assert sizes == [5]
+
+    def test_max_batch_size_splits_batches(self):
+        create = AsyncMock(side_effect=lambda **kwargs: kwargs["messages"])
+        dispatcher = BatchingDispatcher(make_client(create), max_batch_size=2, window_ms=50)
+        sizes = self.track_batches(dispatcher)
+
+        async def run():
+            return await asyncio.gather(*(dispatcher.submit(messages=i) for i in range(5)))
+
+        assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+        assert sizes == [2, 2, 1]
+
+    def test_lone_request_skips_the_window(self):
+        create = AsyncMock(return_value="response")
+        dispatcher = BatchingDispatcher(make_client(create), window_ms=10_000)
+
+        async def run():
+            return await asyncio.wait_for(dispatcher.submit(messages=[]), timeout=1)
+
+        assert asyncio.run(run()) == "response"
+
+    def test_stream_holds_its_slot_until_drained(self):
+        async def stream():
+            yield "Hi"
+            yield " there"
+
+        create = AsyncMock(side_effect=lambda **kwargs: stream())
+        dispatcher = BatchingDispatcher(make_client(create), max_concurrent=1)
+
+        async def run():
+            response = await dispatcher.submit(messages=[], stream=True)
+            assert dispatcher._semaphore.locked()
+            chunks = [chunk async for chunk in response]
+            assert not dispatcher._semaphore.locked()
+            return chunks
+
+        assert asyncio.run(run()) == ["Hi", " there"]
+
+    def test_stream_of_cancelled_submit_is_closed(self):
+        started, finish = asyncio.Event(), asyncio.Event()
+        stream = SimpleNamespace(close=AsyncMock())
+
+        async def create(**kwargs):
+            started.set()
+            await finish.wait()
+            return stream
+
+        dispatcher = BatchingDispatcher(make_client(create), max_concurrent=2)
+
+        async def run():
+            submit = asyncio.create_task(dispatcher.submit(messages=[], stream=True))
+            await started.wait()
+            submit.cancel()
+            finish.set()
+            await asyncio.gather(*dispatcher._inflight)
+            return dispatcher._semaphore._value
+
+        assert asyncio.run(run()) == 2
+        stream.close.assert_awaited_once()
+
+    def test_errors_propagate_to_caller(self):
+        create = AsyncMock(side_effect=Exception("boom"))
+        dispatcher = BatchingDispatcher(make_client(create), window_ms=5)
+
+        with pytest.raises(Exception, match="boom"):
+            asyncio.run(dispatcher.submit(messages=[]))
+
+
+    def test_rate_limit_errors_are_retried(self):
+        create = AsyncMock(side_effect=[make_rate_limit_error(), make_rate_limit_error(), "response"])
+        dispatcher = BatchingDispatcher(make_client(create), window_ms=5)
+
+        with patch("app.services.batching_dispatcher.asyncio.sleep", new=AsyncMock()) as sleep:
+            result = asyncio.run(dispatcher.submit(messages=[]))
+
+        assert result == "response"
+        assert create.await_count == 3
+        assert sleep.await_count == 2
+
+    def test_retries_stop_after_max_attempts(self):
+        create = AsyncMock(side_effect=make_rate_limit_error())
+        dispatcher = BatchingDispatcher(make_client(create), window_ms=5, max_attempts=3)
+
+        with patch("app.services.batching_dispatcher.asyncio.sleep", new=AsyncMock()):
+            with pytest.raises(RateLimitError):
+                asyncio.run(dispatcher.submit(messages=[]))
+
+        assert create.await_count == 3
+
+    def test_retries_stop_at_deadline(self):
+        create = AsyncMock(side_effect=make_rate_limit_error())
+        dispatcher = BatchingDispatcher(make_client(create), max_attempts=6, deadline_seconds=0.12)
+
+        with patch.object(dispatcher, "_backoff", return_value=0.05):
+            with pytest.raises(RateLimitError):
+                asyncio.run(dispatcher.submit(messages=[]))
+
+        assert create.await_count == 3
+
+    def test_stuck_call_is_cut_off_at_deadline(self):
+        async def create(**kwargs):
+            await asyncio.sleep(10)
+
+        dispatcher = BatchingDispatcher(make_client(create), max_concurrent=2, deadline_seconds=0.05)
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(dispatcher.submit(messages=[]))
+
+        assert dispatcher._semaphore._value == 2
+
+    def test_backoff_is_capped(self):
+        dispatcher = BatchingDispatcher(make_client(AsyncMock()), backoff_min=1.0, backoff_max=30.0)
+
+        assert all(0 <= dispatcher._backoff(attempt) <= 30.0 for attempt in range(1, 20))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.services.conversation_store import ConversationStore
+
+
+class TestConversationStore:
+    """Test cases for the bounded conversation store"""
+
+    def test_append_tracks_total_messages(self):
+        store = ConversationStore()
+        asyncio.run(store.append("a", {"role": "user", "content": "Hello"}))
+        asyncio.run(store.append("a", {"role": "assistant", "content": "Hi"}))
+        asyncio.run(store.append("b", {"role": "user", "content": "Hey"}))
+
+        assert asyncio.run(store.count()) == 2
+        assert asyncio.run(store.total_messages()) == 3
+
+        asyncio.run(store.pop("a"))
+        assert asyncio.run(store.total_messages()) == 1
+
+        asyncio.run(store.clear())
+        assert asyncio.run(store.count()) == 0
+        assert asyncio.run(store.total_messages()) == 0
+
+    def test_extend_appends_in_order(self):
+        store = ConversationStore()
+        asyncio.run(store.append("a", {"role": "user", "content": "Hello"}))
+        asyncio.run(store.extend("a", [{"role": "tool", "content": "1"}, {"role": "tool", "content": "2"}]))
+
+        assert [msg["content"] for msg in asyncio.run(store.get("a"))] == ["Hello", "1", "2"]
+        assert asyncio.run(store.total_messages()) == 3
+
+    def test_evicts_least_recently_used(self):
+        store = ConversationStore(max_conversations=2)
+        asyncio.run(store.append("a", {"role": "user", "content": "1"}))
+        asyncio.run(store.append("b", {"role": "user", "content": "2"}))
+        asyncio.run(store.get("a"))
+        asyncio.run(store.append("c", {"role": "user", "content": "3"}))
+
+        assert asyncio.run(store.keys()) == ["a", "c"]
+        assert asyncio.run(store.total_messages()) == 2
+
+    def test_eviction_prefers_short_idle_conversations(self):
+        store = ConversationStore(max_conversations=2, ttl_seconds=3600)
+        with patch("app.services.conversation_store.time.monotonic", return_value=0.0):
+            for i in range(20):
+                asyncio.run(store.append("long", {"role": "user", "content": str(i)}))
+        with patch("app.services.conversation_store.time.monotonic", return_value=1.0):
+            asyncio.run(store.append("short", {"role": "user", "content": "hi"}))
+        with patch("app.services.conversation_store.time.monotonic", return_value=2.0):
+            asyncio.run(store.append("new", {"role": "user", "content": "hey"}))
+
+            assert asyncio.run(store.contains("long"))
+            assert not asyncio.run(store.contains("short"))
+
+    def test_evicts_idle_conversations(self):
+        store = ConversationStore(ttl_seconds=60)
+        with patch("app.services.conversation_store.time.monotonic", return_value=0.0):
+            asyncio.run(store.append("old", {"role": "user", "content": "1"}))
+        with patch("app.services.conversation_store.time.monotonic", return_value=30.0):
+            asyncio.run(store.append("new", {"role": "user", "content": "2"}))
+        with patch("app.services.conversation_store.time.monotonic", return_value=61.0):
+            assert not asyncio.run(store.contains("old"))
+            assert asyncio.run(store.get("old")) is None
+            assert asyncio.run(store.keys()) == ["new"]
+            assert asyncio.run(store.total_messages()) == 1
+
+    def test_summary_is_removed_with_conversation(self):
+        store = ConversationStore(max_conversations=1)
+        asyncio.run(store.append("a", {"role": "user", "content": "1"}))
+        asyncio.run(store.set_summary("a", 1, "User said 1"))
+        assert asyncio.run(store.get_summary("a")) == (1, "User said 1")
+
+        asyncio.run(store.append("b", {"role": "user", "content": "2"}))
+        asyncio.run(store.append("a", {"role": "user", "content": "3"}))
+
+        assert asyncio.run(store.get_summary("a")) is None
+
+    def test_ids_are_cached_until_structural_change(self):
+        store = ConversationStore()
+        asyncio.run(store.append("a", {"role": "user", "content": "1"}))
+        asyncio.run(store.append("b", {"role": "user", "content": "2"}))
+
+        ids = asyncio.run(store.ids())
+        assert ids == ["a", "b"]
+
+        asyncio.run(store.append("a", {"role": "assistant", "content": "3"}))
+        assert asyncio.run(store.ids()) is ids
+
+        asyncio.run(store.pop("a"))
+        assert asyncio.run(store.ids()) == ["b"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from app.chat.gradio_interface import ChatInterface, MAX_DISPLAYED_MESSAGES
+
+
+class TestChatInterface:
+    """Test cases for the Gradio chat interface handlers"""
+
+    def setup_method(self):
+        self.interface = ChatInterface()
+        self.request = SimpleNamespace(session_hash="test_session")
+
+    def call_chat(self, message, history):
+        """Run the streaming chat handler and collect every update it yields"""
+        async def collect():
+            return [update async for update in self.interface.chat_function(
+                message, history, True, True, True, True, False, "", "", "", [], self.request
+            )]
+        return asyncio.run(collect())
+
+    @staticmethod
+    def fake_stream(*deltas):
+        calls = []
+
+        async def astream(*args):
+            calls.append(args)
+            for delta in deltas:
+                yield delta
+
+        return astream, calls
+
+    def test_chat_function_streams_response(self):
+        astream, calls = self.fake_stream("Hi", " there!")
+        with patch.object(self.interface.openai_service, "astream", astream):
+            updates = self.call_chat("Hello", [])
+
+        assert [history[-1]["content"] for history, _ in updates] == ["", "Hi", "Hi there!"]
+        history, textbox = updates[-1]
+        assert history == [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi there!"}]
+        assert textbox == ""
+        assert calls[0][1] == "gradio_test_session"
+
+    def test_chat_function_filters_tools_by_checkbox(self):
+        astream, calls = self.fake_stream("Hi!")
+
+        async def collect():
+            return [update async for update in self.interface.chat_function(
+                "Hello", [], True, False, True, False, False, "", "", "", [], self.request
+            )]
+
+        with patch.object(self.interface.openai_service, "astream", astream):
+            asyncio.run(collect())
+
+        assert calls[0][2] == ["city", "research"]
+
+    def test_chat_function_caps_displayed_history(self):
+        history = [{"role": "user", "content": str(i)} for i in range(100)]
+
+        astream, _ = self.fake_stream("Hi!")
+        with patch.object(self.interface.openai_service, "astream", astream):
+            displayed, _ = self.call_chat("Hello", history)[-1]
+
+        assert len(displayed) == MAX_DISPLAYED_MESSAGES
+        assert displayed[-1] == {"role": "assistant", "content": "Hi!"}
+
+    def test_chat_function_builds_custom_api(self):
+        astream, calls = self.fake_stream("Hi!")
+
+        async def collect():
+            return [update async for update in self.interface.chat_function(
+                "Find repos", [], False, False, False, False, True, "github", "https://api.github.com/search",
+                "Search GitHub", [{"name": "q", "description": "Query", "required": True}, {"name": ""}], self.request
+            )]
+
+        with patch.object(self.interface.openai_service, "astream", astream):
+            asyncio.run(collect())
+
+        custom_api = calls[0][3]
+        assert custom_api.name == "github"
+        assert [param.name for param in custom_api.parameters] == ["q"]
+        assert custom_api.parameters[0].required is True
+
+    def test_collect_parameters_skips_unnamed_rows(self):
+        params = ChatInterface.collect_parameters([
+            ["q", "Query", True], ["", "ignored", False], ["sort", None, False]
+        ])
+
+        assert params == [
+            {"name": "q", "description": "Query", "required": True},
+            {"name": "sort", "description": "", "required": False},
+        ]
+
+    def test_clear_chat_clears_session_conversation(self):
+        with patch.object(self.interface.openai_service, "clear_conversation") as clear_conversation:
+            history = asyncio.run(self.interface.clear_chat(self.request))
+
+        clear_conversation.assert_called_once_with("gradio_test_session")
+        assert history[0]["role"] == "assistant"
+
+    def test_conversation_id_uses_session_hash(self):
+        assert ChatInterface.get_conversation_id(self.request) == "gradio_test_session"
+
+    def test_conversation_id_fallback_is_random(self):
+        first = ChatInterface.get_conversation_id(SimpleNamespace())
+        second = ChatInterface.get_conversation_id(SimpleNamespace())
+
+        assert first.startswith("gradio_") and len(first) == len("gradio_") + 16
+        assert first != second
+
+    def test_conversation_id_fallback_is_stable_per_request(self):
+        request = SimpleNamespace(session_hash=None)
+
+        assert ChatInterface.get_conversation_id(request) == ChatInterface.get_conversation_id(request)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,143 @@
+import logging
+import os
+import queue
+import orjson
+import pytest
+from unittest.mock import patch
+from app.core.logging_config import setup_logging, ColoredFormatter, OrjsonFormatter, RoutingQueueHandler, RoutingQueueListener, log_request_complete, log_request_end, log_request_start
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestQueueLogging:
+    """Test cases for the queue based logging handlers"""
+
+    def setup_method(self):
+        self.debug_handler = RecordingHandler(logging.DEBUG)
+        self.error_handler = RecordingHandler(logging.ERROR)
+        self.log_queue = queue.SimpleQueue()
+        self.listener = RoutingQueueListener(self.log_queue)
+
+        self.logger = logging.getLogger("tests.queue_logging")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.logger.handlers = [RoutingQueueHandler(self.log_queue, (self.debug_handler, self.error_handler))]
+
+    def teardown_method(self):
+        self.logger.handlers = []
+
+    def test_records_are_routed_by_handler_level(self):
+        self.listener.start()
+        self.logger.info("info message")
+        self.logger.error("error message")
+        self.listener.stop()
+
+        assert [r.getMessage() for r in self.debug_handler.records] == ["info message", "error message"]
+        assert [r.getMessage() for r in self.error_handler.records] == ["error message"]
+
+    def test_records_reach_handlers_unformatted(self):
+        self.listener.start()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("failed for %s", "Paris")
+        self.listener.stop()
+
+        record = self.error_handler.records[0]
+        assert (record.msg, record.args) == ("failed for %s", ("Paris",))
+        assert record.exc_info[0] is ValueError
+
+    def test_queue_handler_level_follows_most_verbose_target(self):
+        handler = RoutingQueueHandler(self.log_queue, (RecordingHandler(logging.WARNING), RecordingHandler(logging.INFO)))
+        assert handler.level == logging.INFO
+
+
+class TestSetupLogging:
+    """Test cases for the logging setup entrypoint"""
+
+    def test_only_first_call_configures(self):
+        with patch("app.core.logging_config._configured", False), \
+             patch("app.core.logging_config._install_queue_handlers"), \
+             patch("logging.config.dictConfig") as dict_config, \
+             patch("app.core.logging_config.Path.mkdir"):
+            setup_logging()
+            setup_logging()
+
+        assert dict_config.call_count == 1
+
+
+class TestColoredFormatter:
+    """Test cases for the console formatter"""
+
+    def test_level_is_colored_without_mutating_record(self):
+        record = logging.LogRecord("tests", logging.WARNING, __file__, 1, "careful", None, None)
+        formatted = ColoredFormatter("%(levelname)s | %(message)s").format(record)
+
+        assert formatted == "\033[33mWARNING\033[0m | careful"
+        assert record.levelname == "WARNING"
+        assert logging.Formatter("%(levelname)s").format(record) == "WARNING"
+
+
+class TestOrjsonFormatter:
+    """Test cases for the JSON request log formatter"""
+
+    def test_message_with_quotes_is_valid_json(self):
+        record = logging.LogRecord("tests", logging.INFO, __file__, 7, 'said "hi" %s', ("twice",), None)
+        entry = orjson.loads(OrjsonFormatter().format(record))
+
+        assert entry["message"] == 'said "hi" twice'
+        assert entry["level"] == "INFO"
+        assert entry["line"] == 7
+
+
+class TestRequestCompleteLogging:
+    """Test cases for the per-request summary record"""
+
+    def setup_method(self):
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger("tests.request_complete")
+        self.logger.propagate = False
+        self.logger.handlers = [self.handler]
+
+    def teardown_method(self):
+        self.logger.handlers = []
+
+    def test_single_structured_record(self):
+        self.logger.setLevel(logging.INFO)
+        log_request_complete(self.logger, "req_1", "POST /api/chat", 200, response_length=5, cached=False)
+
+        assert len(self.handler.records) == 1
+        record = self.handler.records[0]
+        assert record.request_id == "req_1"
+        assert record.response_length == 5
+        assert '"cached":false' in record.getMessage()
+
+    def test_skipped_when_info_disabled(self):
+        self.logger.setLevel(logging.WARNING)
+        log_request_complete(self.logger, "req_1", "POST /api/chat", 200, response_length=5)
+
+        assert self.handler.records == []
+
+    def test_request_ids_are_unique_per_process(self):
+        first = log_request_start(self.logger, "POST", "/api/chat")
+        second = log_request_start(self.logger, "POST", "/api/chat")
+
+        assert first != second
+        assert first.split("-")[0] == second.split("-")[0] == f"{os.getpid():x}"
+
+    def test_request_end_serializes_unsupported_types(self):
+        self.logger.setLevel(logging.DEBUG)
+        log_request_end(self.logger, "req_1", 200, {"status": object(), "length": 3})
+
+        assert '"length":3' in self.handler.records[-1].getMessage()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
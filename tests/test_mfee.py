@@ -0,0 +1,26 @@
+import pytest
+from app.services import mfee
+
+
+class TestClassify:
+    """Test cases for the pre-model message classifier"""
+
+    @pytest.mark.parametrize("message", ["hi", "Hello!", "  hey there 👋 ", "Good Morning."])
+    def test_greetings_are_direct(self, message):
+        decision = mfee.classify(message)
+        assert decision.kind == mfee.DIRECT
+        assert decision.response == mfee.GREETING_RESPONSE
+
+    @pytest.mark.parametrize("message", ["?", "👍", "...", "k", "!!! ??"])
+    def test_trivial_messages_ask_for_clarification(self, message):
+        decision = mfee.classify(message)
+        assert decision.kind == mfee.DIRECT
+        assert decision.response == mfee.CLARIFY_RESPONSE
+
+    @pytest.mark.parametrize("message", ["What's the weather in Paris?", "hi, tell me about Rome", "42"])
+    def test_real_questions_go_to_model(self, message):
+        assert mfee.classify(message).kind == mfee.RENDER
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,424 @@
+import asyncio
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock, AsyncMock, patch
+from app.services.openai_service import OpenAIService, MAX_PROMPT_TURNS, MAX_TURNS_RESPONSE, SUMMARY_BATCH_TURNS
+
+
+def make_completion(content=None, tool_calls=None):
+    """Build a minimal object shaped like an OpenAI chat completion"""
+    message = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_tool_call(call_id, name, arguments):
+    """Build a minimal object shaped like an OpenAI tool call"""
+    return SimpleNamespace(id=call_id, type="function", function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class TestOpenAIServiceAsync:
+    """Test cases for the async chat path of OpenAIService"""
+
+    def setup_method(self):
+        self.service = OpenAIService()
+        asyncio.run(self.service.clear_conversation())
+        self.service._tools_cache.clear()
+
+    def test_achat_returns_final_message(self):
+        create = AsyncMock(return_value=make_completion(content="Hi there!"))
+
+        with patch.object(self.service.async_client.chat.completions, "create", create):
+            response, conversation_id = asyncio.run(self.service.achat("Hello", "test_achat"))
+
+        assert response == "Hi there!"
+        assert conversation_id == "test_achat"
+        assert create.await_count == 1
+        assert create.await_args.kwargs["timeout"] == self.service.request_timeout
+        history = asyncio.run(self.service.get_conversation_history("test_achat"))
+        assert [msg["role"] for msg in history] == ["user", "assistant"]
+
+    def test_achat_executes_tool_calls(self):
+        tool_call = make_tool_call("call_1", "get_weather", '{"city_name": "Paris"}')
+        create = AsyncMock(side_effect=[
+            make_completion(tool_calls=[tool_call]),
+            make_completion(content="It is sunny in Paris."),
+        ])
+        get_weather = Mock(return_value="Sunny, 25°C")
+
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "get_available_functions", return_value={"get_weather": get_weather}):
+            response, _ = asyncio.run(self.service.achat("Weather in Paris?", "test_achat_tools"))
+
+        assert response == "It is sunny in Paris."
+        get_weather.assert_called_once_with(city_name="Paris")
+        history = asyncio.run(self.service.get_conversation_history("test_achat_tools"))
+        assert [msg["role"] for msg in history] == ["user", "assistant", "tool", "assistant"]
+        assert history[2]["content"] == "Sunny, 25°C"
+
+    def test_achat_extends_prompt_between_turns(self):
+        tool_call = make_tool_call("call_1", "get_weather", '{"city_name": "Paris"}')
+        create = AsyncMock(side_effect=[
+            make_completion(tool_calls=[tool_call]),
+            make_completion(content="It is sunny in Paris."),
+        ])
+
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "get_available_functions", return_value={"get_weather": Mock(return_value="Sunny")}), \
+             patch.object(self.service, "_evict", wraps=OpenAIService._evict) as evict:
+            asyncio.run(self.service.achat("Weather in Paris?", "test_achat_prompt"))
+
+        first, second = (call.kwargs["messages"] for call in create.await_args_list)
+        assert first is second
+        assert evict.call_count == 1
+        assert [msg["role"] for msg in second[-3:]] == ["user", "assistant", "tool"]
+
+    def test_achat_deduplicates_tool_calls_in_a_turn(self):
+        tool_calls = [
+            make_tool_call("call_1", "get_weather", '{"city_name": "Paris"}'),
+            make_tool_call("call_2", "get_weather", '{ "city_name":"Paris" }'),
+        ]
+        create = AsyncMock(side_effect=[
+            make_completion(tool_calls=tool_calls),
+            make_completion(content="It is sunny in Paris."),
+        ])
+        get_weather = Mock(return_value="Sunny")
+
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "get_available_functions", return_value={"get_weather": get_weather}):
+            asyncio.run(self.service.achat("Weather in Paris?", "test_achat_dedupe"))
+
+        get_weather.assert_called_once_with(city_name="Paris")
+        history = asyncio.run(self.service.get_conversation_history("test_achat_dedupe"))
+        assert [(msg["tool_call_id"], msg["content"]) for msg in history if msg["role"] == "tool"] == [
+            ("call_1", "Sunny"), ("call_2", "Sunny")
+        ]
+
+    def test_achat_stops_on_repeated_tool_calls(self):
+        create = AsyncMock(side_effect=[
+            make_completion(tool_calls=[make_tool_call("call_1", "get_weather", '{"city_name": "Paris"}')]),
+            make_completion(tool_calls=[make_tool_call("call_2", "get_weather", '{"city_name": "Paris"}')]),
+        ])
+        get_weather = Mock(return_value="Sunny")
+
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "get_available_functions", return_value={"get_weather": get_weather}):
+            response, _ = asyncio.run(self.service.achat("Weather in Paris?", "test_achat_loop"))
+
+        assert create.await_count == 2
+        get_weather.assert_called_once()
+        assert response == MAX_TURNS_RESPONSE
+        history = asyncio.run(self.service.get_conversation_history("test_achat_loop"))
+        assert [msg["role"] for msg in history] == ["user", "assistant", "tool", "assistant"]
+
+    def test_achat_tool_model_decides_and_main_model_answers(self):
+        create = AsyncMock(side_effect=[
+            make_completion(tool_calls=[make_tool_call("call_1", "get_weather", '{"city_name": "Paris"}')]),
+            make_completion(content="Draft from the tool model"),
+            make_completion(content="It is sunny in Paris."),
+        ])
+
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "get_available_functions", return_value={"get_weather": Mock(return_value="Sunny")}), \
+             patch.object(self.service, "tool_model", "gpt-4o-mini"):
+            response, _ = asyncio.run(self.service.achat("Weather in Paris?", "test_achat_tool_model"))
+
+        assert response == "It is sunny in Paris."
+        assert [call.kwargs["model"] for call in create.await_args_list] == ["gpt-4o-mini", "gpt-4o-mini", self.service.model]
+
+    def test_achat_main_model_answers_when_tool_model_needs_no_tools(self):
+        create = AsyncMock(side_effect=[
+            make_completion(content="Draft from the tool model"),
+            make_completion(content="Hello! How can I help?"),
+        ])
+
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "tool_model", "gpt-4o-mini"):
+            response, _ = asyncio.run(self.service.achat("Hi", "test_achat_tool_model_plain"))
+
+        assert response == "Hello! How can I help?"
+        assert [call.kwargs["model"] for call in create.await_args_list] == ["gpt-4o-mini", self.service.model]
+
+    def test_achat_runs_tool_calls_concurrently(self):
+        tool_calls = [
+            make_tool_call("call_1", "get_weather", '{"city_name": "Paris"}'),
+            make_tool_call("call_2", "get_city_info", '{"city_name": "Paris"}'),
+            make_tool_call("call_3", "get_weather", '{"city_name": "Paris"}'),
+        ]
+        create = AsyncMock(side_effect=[
+            make_completion(tool_calls=tool_calls),
+            make_completion(content="Paris is sunny and lovely."),
+        ])
+        barrier = threading.Barrier(2, timeout=5)
+
+        threads = []
+
+        def get_weather(city_name):
+            threads.append(threading.current_thread().name)
+            barrier.wait()  # Only passes if both tools run at the same time
+            return "Sunny"
+
+        def get_city_info(city_name):
+            barrier.wait()
+            return "Capital of France"
+
+        functions = {"get_weather": get_weather, "get_city_info": get_city_info}
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "get_available_functions", return_value=functions):
+            response, _ = asyncio.run(self.service.achat("Paris weather and info?", "test_achat_parallel"))
+
+        assert response == "Paris is sunny and lovely."
+        assert create.await_args.kwargs["parallel_tool_calls"] is True
+        assert threads[0].startswith("tool")
+        history = asyncio.run(self.service.get_conversation_history("test_achat_parallel"))
+        assert [(msg.get("tool_call_id"), msg["content"]) for msg in history if msg["role"] == "tool"] == [
+            ("call_1", "Sunny"), ("call_2", "Capital of France"), ("call_3", "Sunny")
+        ]
+
+    def test_achat_handles_openai_error(self):
+        create = AsyncMock(side_effect=Exception("boom"))
+
+        with patch.object(self.service.async_client.chat.completions, "create", create):
+            response, conversation_id = asyncio.run(self.service.achat("Hello", "test_achat_error"))
+
+        assert "internal error" in response
+        assert conversation_id == "test_achat_error"
+
+
+def make_stream(*chunks):
+    """Build an async iterator shaped like an OpenAI streaming response"""
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+    return stream()
+
+
+def make_chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def make_tool_call_delta(index, call_id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class TestOpenAIServiceStream:
+    """Test cases for the streaming chat path of OpenAIService"""
+
+    def setup_method(self):
+        self.service = OpenAIService()
+        asyncio.run(self.service.clear_conversation())
+        self.service._tools_cache.clear()
+
+    def collect(self, *args):
+        async def run():
+            return [delta async for delta in self.service.astream(*args)]
+        return asyncio.run(run())
+
+    def test_astream_yields_deltas(self):
+        create = AsyncMock(return_value=make_stream(make_chunk("Hi"), make_chunk(" there!")))
+
+        with patch.object(self.service.async_client.chat.completions, "create", create):
+            deltas = self.collect("Hello", "test_stream")
+
+        assert deltas == ["Hi", " there!"]
+        assert create.await_args.kwargs["stream"] is True
+        history = asyncio.run(self.service.get_conversation_history("test_stream"))
+        assert history[-1] == {"role": "assistant", "content": "Hi there!"}
+
+    def test_astream_buffers_tool_call_deltas(self):
+        create = AsyncMock(side_effect=[
+            make_stream(
+                make_chunk(tool_calls=[make_tool_call_delta(0, "call_1", "get_weather", '{"city_')]),
+                make_chunk(tool_calls=[make_tool_call_delta(0, arguments='name": "Paris"}')]),
+            ),
+            make_stream(make_chunk("Sunny in Paris.")),
+        ])
+        get_weather = Mock(return_value="Sunny, 25°C")
+
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "get_available_functions", return_value={"get_weather": get_weather}):
+            deltas = self.collect("Weather in Paris?", "test_stream_tools")
+
+        assert deltas == ["Sunny in Paris."]
+        get_weather.assert_called_once_with(city_name="Paris")
+        history = asyncio.run(self.service.get_conversation_history("test_stream_tools"))
+        assert [msg["role"] for msg in history] == ["user", "assistant", "tool", "assistant"]
+        assert history[1]["tool_calls"][0]["function"]["arguments"] == '{"city_name": "Paris"}'
+
+    def test_astream_starts_tool_calls_while_streaming(self):
+        first_tool_started = threading.Event()
+
+        async def stream():
+            yield make_chunk(tool_calls=[make_tool_call_delta(0, "call_1", "get_weather", '{"city_name": "Paris"}')])
+            yield make_chunk(tool_calls=[make_tool_call_delta(1, "call_2", "get_city_info", '{"city_name": "Paris"}')])
+            # The first call is complete once the second begins, it should already be running
+            started = await asyncio.to_thread(first_tool_started.wait, 5)
+            yield make_chunk(content=None if started else "not started")
+
+        def get_weather(city_name):
+            first_tool_started.set()
+            return "Sunny"
+
+        create = AsyncMock(side_effect=[stream(), make_stream(make_chunk("Sunny Paris."))])
+        functions = {"get_weather": get_weather, "get_city_info": Mock(return_value="Capital of France")}
+
+        with patch.object(self.service.async_client.chat.completions, "create", create), \
+             patch.object(self.service, "get_available_functions", return_value=functions):
+            deltas = self.collect("Paris weather and info?", "test_stream_early_tools")
+
+        assert deltas == ["Sunny Paris."]
+        history = asyncio.run(self.service.get_conversation_history("test_stream_early_tools"))
+        assert [(msg["tool_call_id"], msg["content"]) for msg in history if msg["role"] == "tool"] == [
+            ("call_1", "Sunny"), ("call_2", "Capital of France")
+        ]
+
+    def test_astream_yields_error_response(self):
+        create = AsyncMock(side_effect=Exception("boom"))
+
+        with patch.object(self.service.async_client.chat.completions, "create", create):
+            deltas = self.collect("Hello", "test_stream_error")
+
+        assert len(deltas) == 1
+        assert "internal error" in deltas[0]
+
+
+class TestPromptPrefix:
+    """Test cases for the shared system prompt prefix"""
+
+    def setup_method(self):
+        self.service = OpenAIService()
+        self.service._tools_cache.clear()
+
+    def test_system_prompt_is_static_across_tool_filters(self):
+        _, _, all_tools_messages, all_tools_prefix = self.service._prepare_tools()
+        filtered_tools, _, filtered_messages, filtered_prefix = self.service._prepare_tools(filter_tools=["weather"])
+
+        assert [tool["function"]["name"] for tool in filtered_tools] == ["get_weather"]
+        assert all_tools_messages[0] == filtered_messages[0]
+        assert len(all_tools_messages) == 1
+        assert "(Currently Disabled)" in filtered_messages[1]["content"]
+        assert all_tools_prefix != filtered_prefix
+
+    def test_prefix_id_is_stable_for_same_tool_set(self):
+        _, _, _, first = self.service._prepare_tools(filter_tools=["weather"])
+        _, _, _, second = self.service._prepare_tools(filter_tools=["weather"])
+
+        assert first == second
+
+    def test_prepared_tools_are_cached_per_tool_set(self):
+        with patch.object(self.service, "get_tool_definitions", wraps=self.service.get_tool_definitions) as get_tool_definitions:
+            first = self.service._prepare_tools(filter_tools=["weather", "city"])
+            second = self.service._prepare_tools(filter_tools=["city", "weather"])
+            self.service._prepare_tools(filter_tools=["city"])
+
+        assert first is second
+        assert get_tool_definitions.call_count == 2
+
+
+class TestHistoryCompaction:
+    """Test cases for the prompt view built from long conversation histories"""
+
+    @staticmethod
+    def build_history(turns, tool_content="result"):
+        history = []
+        for i in range(turns):
+            history.append({"role": "user", "content": f"question {i}"})
+            history.append({"role": "assistant", "content": None, "tool_calls": [
+                {"id": f"call_{i}", "type": "function", "function": {"name": "get_weather", "arguments": "{}"}}
+            ]})
+            history.append({"role": "tool", "tool_call_id": f"call_{i}", "content": tool_content})
+            history.append({"role": "assistant", "content": f"answer {i}"})
+        return history
+
+    def test_short_history_is_unchanged(self):
+        history = self.build_history(3)
+        assert OpenAIService._evict(history) is history
+
+    def test_old_messages_are_archived(self):
+        history = self.build_history(10)
+        compacted = OpenAIService._evict(history)
+
+        assert len(compacted) == len(history)
+        assert [msg["role"] for msg in compacted] == [msg["role"] for msg in history]
+        assert compacted[0]["content"] == "question 0"
+        assert compacted[2]["content"] == "[archived]"
+        assert compacted[3]["content"] == "[archived]"
+        assert compacted[-1]["content"] == "answer 9"
+        assert history[3]["content"] == "answer 0"
+
+    def test_turns_beyond_prompt_window_are_dropped(self):
+        history = self.build_history(MAX_PROMPT_TURNS + 5)
+        compacted = OpenAIService._evict(history)
+
+        assert len(compacted) == MAX_PROMPT_TURNS * 4
+        assert compacted[0] == {"role": "user", "content": "question 5"}
+        assert compacted[-1]["content"] == f"answer {MAX_PROMPT_TURNS + 4}"
+        assert len(history) == (MAX_PROMPT_TURNS + 5) * 4
+
+    def test_repeated_tool_errors_collapse(self):
+        history = self.build_history(7, tool_content="Error executing get_weather: timeout\nTraceback...")
+        compacted = OpenAIService._evict(history)
+
+        assert compacted[2]["content"] == "Error executing get_weather: timeout"
+        assert compacted[6]["content"] == "[repeated tool error]"
+        assert compacted[-2]["content"] == history[-2]["content"]
+
+
+
+class TestHistorySummary:
+    """Test cases for the running summary of turns beyond the prompt window"""
+
+    def setup_method(self):
+        self.service = OpenAIService()
+        asyncio.run(self.service.clear_conversation())
+        self.service._tools_cache.clear()
+
+    def seed(self, conversation_id, turns):
+        for i in range(turns):
+            asyncio.run(self.service.conversations.extend(conversation_id, [
+                {"role": "user", "content": f"question {i}"},
+                {"role": "assistant", "content": f"answer {i}"}
+            ]))
+
+    def test_dropped_turns_are_summarized_once(self):
+        self.seed("test_summary", MAX_PROMPT_TURNS + SUMMARY_BATCH_TURNS - 1)
+        create = AsyncMock(side_effect=[
+            make_completion(content="User asked many questions."),
+            make_completion(content="First answer"),
+            make_completion(content="Second answer"),
+        ])
+
+        with patch.object(self.service.async_client.chat.completions, "create", create):
+            asyncio.run(self.service.achat("Next question", "test_summary"))
+            asyncio.run(self.service.achat("Another question", "test_summary"))
+
+        summary_call, first_call, second_call = create.await_args_list
+        assert "question 0" in summary_call.kwargs["messages"][1]["content"]
+        for call in (first_call, second_call):
+            summary_messages = [msg for msg in call.kwargs["messages"] if msg["role"] == "system" and "Summary" in msg["content"]]
+            assert summary_messages[0]["content"].endswith("User asked many questions.")
+
+    def test_summary_covering_more_than_the_history_is_ignored(self):
+        self.seed("test_summary_stale", 2)
+        asyncio.run(self.service.conversations.set_summary("test_summary_stale", 40, "Summary of another conversation"))
+        create = AsyncMock(return_value=make_completion(content="Answer"))
+
+        with patch.object(self.service.async_client.chat.completions, "create", create):
+            asyncio.run(self.service.achat("Next question", "test_summary_stale"))
+
+        assert all("Summary" not in msg["content"] for msg in create.await_args.kwargs["messages"] if msg["role"] == "system")
+
+    def test_summary_failure_falls_back_to_window(self):
+        self.seed("test_summary_error", MAX_PROMPT_TURNS + SUMMARY_BATCH_TURNS)
+        create = AsyncMock(side_effect=[Exception("boom"), make_completion(content="Answer")])
+
+        with patch.object(self.service.async_client.chat.completions, "create", create):
+            response, _ = asyncio.run(self.service.achat("Next question", "test_summary_error"))
+
+        assert response == "Answer"
+        assert all("Summary" not in msg["content"] for msg in create.await_args.kwargs["messages"] if msg["role"] == "system")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import uuid
+import pytest
+import redis
+from app.services.redis_conversation_store import RedisConversationStore
+
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest.fixture
+def run_with_store():
+    """Run a test coroutine against a fresh store, on a single event loop as async connections are bound to it"""
+    try:
+        redis.Redis.from_url(REDIS_URL).ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis server not available")
+    key_prefix = f"test_conv_{uuid.uuid4().hex}"
+
+    def run(scenario):
+        async def main():
+            store = RedisConversationStore(REDIS_URL, key_prefix=key_prefix)
+            try:
+                await scenario(store)
+            finally:
+                await store.clear()
+                await store.redis.delete(store.total_key)
+                await store.aclose()
+        asyncio.run(main())
+
+    return run
+
+
+class TestRedisConversationStore:
+    """Test cases for the Redis backed conversation store"""
+
+    def test_append_tracks_total_messages(self, run_with_store):
+        async def scenario(store):
+            await store.append("a", {"role": "user", "content": "Hello"})
+            await store.append("a", {"role": "assistant", "content": "Hi"})
+            await store.append("b", {"role": "user", "content": "Hey"})
+
+            assert await store.count() == 2
+            assert await store.total_messages() == 3
+            assert await store.get("a") == [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi"}]
+
+            await store.pop("a")
+            assert await store.total_messages() == 1
+            assert await store.get("a") is None
+
+        run_with_store(scenario)
+
+    def test_history_shared_between_stores(self, run_with_store):
+        async def scenario(store):
+            other = RedisConversationStore(REDIS_URL, key_prefix=store.key_prefix)
+            await store.append("a", {"role": "user", "content": "Hello"})
+            assert await other.get("a") == [{"role": "user", "content": "Hello"}]
+
+            await other.append("a", {"role": "assistant", "content": "Hi"})
+            assert await store.get("a") == [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi"}]
+            await other.aclose()
+
+        run_with_store(scenario)
+
+    def test_extend_appends_in_order(self, run_with_store):
+        async def scenario(store):
+            other = RedisConversationStore(REDIS_URL, key_prefix=store.key_prefix)
+            await store.append("a", {"role": "user", "content": "Hello"})
+            await store.extend("a", [{"role": "tool", "content": "1"}, {"role": "tool", "content": "2"}])
+
+            assert [msg["content"] for msg in await other.get("a")] == ["Hello", "1", "2"]
+            assert await store.total_messages() == 3
+            await other.aclose()
+
+        run_with_store(scenario)
+
+    def test_summary_is_removed_with_conversation(self, run_with_store):
+        async def scenario(store):
+            await store.append("a", {"role": "user", "content": "1"})
+            await store.set_summary("a", 1, "User said 1")
+            assert await store.get_summary("a") == (1, "User said 1")
+
+            await store.pop("a")
+            assert await store.get_summary("a") is None
+
+        run_with_store(scenario)
+
+    def test_evicts_least_recently_used(self, run_with_store):
+        async def scenario(store):
+            store.max_conversations = 2
+            await store.append("a", {"role": "user", "content": "1"})
+            await store.append("b", {"role": "user", "content": "2"})
+            await store.get("a")
+            await store.append("c", {"role": "user", "content": "3"})
+
+            assert sorted(await store.keys()) == ["a", "c"]
+            assert await store.total_messages() == 2
+
+        run_with_store(scenario)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from app.services.response_cache import ResponseCache
+
+
+def make_embedding_client(vectors):
+    """Build a fake async client whose embeddings.create returns the mapped vector per input"""
+    async def create(model, input):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=vectors[input])])
+
+    return SimpleNamespace(embeddings=SimpleNamespace(create=AsyncMock(side_effect=create)))
+
+
+class TestResponseCache:
+    """Test cases for the two-tier response cache"""
+
+    def test_exact_hit_ignores_case_and_whitespace(self):
+        cache = ResponseCache()
+        asyncio.run(cache.put("Weather in Tokyo", "Sunny"))
+
+        assert asyncio.run(cache.lookup("  weather   in tokyo ")) == "Sunny"
+        assert asyncio.run(cache.lookup("Weather in Osaka")) is None
+
+    def test_namespace_isolates_entries(self):
+        cache = ResponseCache()
+        asyncio.run(cache.put("Hello", "Hi!", namespace="gpt-4o"))
+
+        assert asyncio.run(cache.lookup("Hello", namespace="gpt-4o-mini")) is None
+
+    def test_expired_entries_are_dropped(self):
+        cache = ResponseCache(ttl_seconds=10)
+        with patch("app.services.response_cache.time.monotonic", return_value=100.0):
+            asyncio.run(cache.put("Hello", "Hi!"))
+        with patch("app.services.response_cache.time.monotonic", return_value=111.0):
+            assert asyncio.run(cache.lookup("Hello")) is None
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        asyncio.run(cache.put("a", "1"))
+        asyncio.run(cache.put("b", "2"))
+        asyncio.run(cache.lookup("a"))
+        asyncio.run(cache.put("c", "3"))
+
+        assert asyncio.run(cache.lookup("a")) == "1"
+        assert asyncio.run(cache.lookup("b")) is None
+
+    def test_semantic_hit(self):
+        client = make_embedding_client({
+            "weather in tokyo": [1.0, 0.0, 0.0],
+            "what's the weather in tokyo": [0.99, 0.05, 0.0],
+            "tell me about paris": [0.0, 1.0, 0.0],
+        })
+        cache = ResponseCache(client=client, semantic_enabled=True, similarity_threshold=0.95)
+
+        asyncio.run(cache.put("Weather in Tokyo", "Sunny"))
+
+        assert asyncio.run(cache.lookup("What's the weather in Tokyo")) == "Sunny"
+        assert asyncio.run(cache.lookup("Tell me about Paris")) is None
+
+    def test_semantic_hit_ignores_closer_entry_from_another_namespace(self):
+        client = make_embedding_client({
+            "weather in tokyo": [1.0, 0.0, 0.0],
+            "tokyo weather": [0.98, 0.2, 0.0],
+            "what's the weather in tokyo": [0.99, 0.05, 0.0],
+        })
+        cache = ResponseCache(client=client, semantic_enabled=True, similarity_threshold=0.95)
+
+        asyncio.run(cache.put("Tokyo weather", "Sunny", namespace="gpt-4o"))
+        asyncio.run(cache.put("Weather in Tokyo", "Soleado", namespace="gpt-4o-mini"))
+
+        assert asyncio.run(cache.lookup("What's the weather in Tokyo", namespace="gpt-4o")) == "Sunny"
+
+    def test_semantic_tier_survives_save_and_load(self, tmp_path):
+        vectors = {"weather in tokyo": [1.0, 0.0, 0.0], "what's the weather in tokyo": [0.99, 0.05, 0.0]}
+        path = str(tmp_path / "semantic_cache.npz")
+        cache = ResponseCache(client=make_embedding_client(vectors), semantic_enabled=True)
+        asyncio.run(cache.put("Weather in Tokyo", "Sunny"))
+        cache.save(path)
+
+        restored = ResponseCache(client=make_embedding_client(vectors), semantic_enabled=True)
+
+        assert restored.load(path) is True
+        assert asyncio.run(restored.lookup("What's the weather in Tokyo")) == "Sunny"
+
+    def test_load_ignores_cache_saved_with_another_model(self, tmp_path):
+        vectors = {"weather in tokyo": [1.0, 0.0, 0.0]}
+        path = str(tmp_path / "semantic_cache.npz")
+        cache = ResponseCache(client=make_embedding_client(vectors), semantic_enabled=True)
+        asyncio.run(cache.put("Weather in Tokyo", "Sunny"))
+        cache.save(path)
+
+        restored = ResponseCache(client=make_embedding_client(vectors), semantic_enabled=True,
+                                 embedding_model="text-embedding-3-large")
+
+        assert restored.load(path) is False
+        assert restored._vectors is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
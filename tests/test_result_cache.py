@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import patch
+from app.tools.base.result_cache import ToolResultCache
+
+
+class TestToolResultCache:
+    """Test cases for the shared tool result cache"""
+
+    def test_put_and_get(self):
+        cache = ToolResultCache()
+        cache.put(("get_weather", "paris"), "Sunny", ttl_seconds=300)
+
+        assert cache.get(("get_weather", "paris")) == "Sunny"
+        assert cache.get(("get_weather", "london")) is None
+
+    def test_entries_expire_after_their_ttl(self):
+        cache = ToolResultCache()
+        with patch("app.tools.base.result_cache.time.monotonic", return_value=1000.0):
+            cache.put("weather", "Sunny", ttl_seconds=300)
+            cache.put("city", "Capital of France", ttl_seconds=86400)
+
+        with patch("app.tools.base.result_cache.time.monotonic", return_value=1400.0):
+            assert cache.get("weather") is None
+            assert cache.get("city") == "Capital of France"
+        assert len(cache) == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = ToolResultCache(max_entries=2)
+        cache.put("a", "1", ttl_seconds=60)
+        cache.put("b", "2", ttl_seconds=60)
+        cache.get("a")
+        cache.put("c", "3", ttl_seconds=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -4,7 +4,9 @@ from app.tools.city_tool import CityTool
 from app.tools.weather_tool import WeatherTool
 from app.tools.research_tool import ResearchTool
 from app.tools.product_tool import ProductTool
+from app.tools.custom_api_tool import CustomAPITool
 from app.models.product import Product
+from app.tools.base.base_tool import tool_result_cache
 from decimal import Decimal
 
 
@@ -13,8 +15,9 @@ class TestCityTool:
 
     def setup_method(self):
         self.city_tool = CityTool()
+        tool_result_cache.clear()
 
-    @patch('app.tools.city_tool.requests.get')
+    @patch('app.tools.city_tool.requests.Session.get')
     def test_get_city_info_success(self, mock_get):
         # Mock successful Wikipedia API response
         mock_response = Mock()
@@ -34,7 +37,29 @@ class TestCityTool:
         assert "48.8566" in result
         mock_get.assert_called_once()
 
-    @patch('app.tools.city_tool.requests.get')
+    @patch('app.tools.city_tool.requests.Session.get')
+    def test_get_city_info_is_cached(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'title': 'Paris', 'extract': 'Capital of France.'}
+        mock_get.return_value = mock_response
+
+        first = self.city_tool.get_city_info("Paris")
+        second = self.city_tool.get_city_info("  paris ")
+
+        assert first == second
+        mock_get.assert_called_once()
+
+    @patch('app.tools.city_tool.requests.Session.get')
+    def test_get_city_info_errors_are_not_cached(self, mock_get):
+        import requests
+        mock_get.side_effect = requests.exceptions.Timeout("Request timeout")
+        self.city_tool.get_city_info("Paris")
+        self.city_tool.get_city_info("Paris")
+
+        assert mock_get.call_count == 2
+
+    @patch('app.tools.city_tool.requests.Session.get')
     def test_get_city_info_not_found(self, mock_get):
         # Mock 404 response
         mock_response = Mock()
@@ -46,11 +71,44 @@ class TestCityTool:
         assert "couldn't find information" in result
         assert "Nonexistentcity" in result
 
+    @patch('app.tools.city_tool.requests.Session.get')
+    def test_get_city_info_not_found_is_cached(self, mock_get):
+        mock_get.return_value = Mock(status_code=404)
+
+        first = self.city_tool.get_city_info("NonexistentCity")
+        second = self.city_tool.get_city_info("nonexistentcity")
+
+        assert first == second
+        assert mock_get.call_count == 4
+
+    @patch('app.tools.city_tool.requests.Session.get')
+    def test_get_city_info_prefers_first_found_variation(self, mock_get):
+        def get(url, **kwargs):
+            found = url.endswith(("Springfield,_United_States", "Springfield,_UK"))
+            return Mock(status_code=200 if found else 404, json=Mock(return_value={'title': url.rsplit('/', 1)[1]}))
+        mock_get.side_effect = get
+
+        result = self.city_tool.get_city_info("springfield")
+
+        assert "Springfield,_United_States" in result
+        assert mock_get.call_count == 4
+
+    def test_format_city_response(self):
+        result = self.city_tool._format_city_response({
+            'title': 'Quito',
+            'extract': 'x' * 600,
+            'coordinates': {'lat': 0.0, 'lon': -78.4678},
+        }, "Quito")
+
+        assert result.startswith("🏙️ **Quito**\n\n" + "x" * 497 + "...")
+        assert result.endswith("📍 **Location**: 0.0000°, -78.4678°")
+        assert "Wikipedia" not in result
+
     def test_get_city_info_empty_input(self):
         result = self.city_tool.get_city_info("")
         assert "Please provide a valid city name" in result
 
-    @patch('app.tools.city_tool.requests.get')
+    @patch('app.tools.city_tool.requests.Session.get')
     def test_get_city_info_timeout(self, mock_get):
         import requests
         mock_get.side_effect = requests.exceptions.Timeout("Request timeout")
@@ -63,6 +121,7 @@ class TestWeatherTool:
 
     def setup_method(self):
         self.weather_tool = WeatherTool()
+        tool_result_cache.clear()
 
     @patch('app.tools.weather_tool.requests.get')
     def test_get_weather_success(self, mock_get):
@@ -113,6 +172,7 @@ class TestResearchTool:
 
     def setup_method(self):
         self.research_tool = ResearchTool()
+        tool_result_cache.clear()
 
     @patch('app.tools.research_tool.requests.get')
     def test_search_research_success(self, mock_get):
@@ -159,6 +219,7 @@ class TestProductTool:
 
     def setup_method(self):
         self.product_tool = ProductTool()
+        tool_result_cache.clear()
 
     @patch('app.tools.product_tool.SessionLocal')
     def test_find_products_success(self, mock_session):
@@ -210,6 +271,28 @@ class TestProductTool:
         assert "No products found" in result
 
 
+class TestCustomAPITool:
+    """Test cases for CustomAPITool"""
+
+    def setup_method(self):
+        self.custom_tool = CustomAPITool("Jokes", "https://example.com/jokes", "Get a joke", [{"name": "topic"}])
+
+    @patch('app.tools.custom_api_tool.requests.get')
+    def test_call_api_parses_json(self, mock_get):
+        mock_get.return_value = Mock(status_code=200, content=b'{"joke": "Why did the chicken cross the road?"}')
+
+        result = self.custom_tool.call_api(topic="animals")
+
+        assert result == {"joke": "Why did the chicken cross the road?"}
+        assert mock_get.call_args.kwargs["params"] == {"topic": "animals"}
+
+    @patch('app.tools.custom_api_tool.requests.get')
+    def test_call_api_falls_back_to_text(self, mock_get):
+        mock_get.return_value = Mock(status_code=200, content=b"Knock knock", text="Knock knock")
+
+        assert self.custom_tool.call_api() == "Knock knock"
+
+
 # Integration test for all tools
 class TestToolsIntegration:
     """Integration tests for all tools working together"""
@@ -257,5 +340,37 @@ class TestToolsIntegration:
         assert "search term" in product_result.lower() or "provide" in product_result.lower()
 
 
+class TestToolRegistry:
+    """Test cases for the tool registry"""
+
+    def setup_method(self):
+        from app.tools.registry import get_tool_registry
+        self.registry = get_tool_registry()
+
+    def test_tool_lookups_are_cached_copies(self):
+        with patch.object(self.registry, "_build_definitions", wraps=self.registry._build_definitions) as build:
+            self.registry._definitions = None
+            first = self.registry.get_openai_tool_definitions()
+            first.append({"type": "function", "function": {"name": "extra"}})
+            second = self.registry.get_openai_tool_definitions()
+
+        assert build.call_count == 1
+        assert len(second) == len(first) - 1
+
+        names = [definition["function"]["name"] for definition in second]
+        assert names == sorted(names)
+
+        functions = self.registry.get_available_functions()
+        functions["extra"] = None
+        assert "extra" not in self.registry.get_available_functions()
+
+    def test_tool_definition_by_function_name(self):
+        definition = self.registry.get_openai_tool_definition("get_city_info")
+
+        assert definition in self.registry.get_openai_tool_definitions()
+        assert definition["function"]["name"] == "get_city_info"
+        assert self.registry.get_openai_tool_definition("missing") is None
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file